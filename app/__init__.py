@@ -5,11 +5,17 @@ from flask_cors import CORS
 from app.database import db, migrate
 from app.routes import register_blueprints
 from app.errors import register_error_handlers
+from app.commands import register_commands
 from app.constants import MAX_FILE_SIZE
 
 load_dotenv()
 
 
+def _id_list(value):
+    """Parse a comma-separated list of ids from an environment variable."""
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
 def create_app():
     app = Flask(__name__, static_folder="static")
 
@@ -18,15 +24,26 @@ def create_app():
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["MAX_CONTENT_LENGTH"] = MAX_FILE_SIZE
 
+    # Landing page selection: newest, most_owned or editor_picks
+    app.config["HOME_FEED_POLICY"] = os.getenv("HOME_FEED_POLICY", "newest")
+    app.config["HOME_FEED_SIZE"] = int(os.getenv("HOME_FEED_SIZE", "4"))
+    app.config["HOME_EDITOR_PICK_COURSES"] = _id_list(os.getenv("HOME_EDITOR_PICK_COURSES", ""))
+    app.config["HOME_EDITOR_PICK_BLOGS"] = _id_list(os.getenv("HOME_EDITOR_PICK_BLOGS", ""))
+
     # Configure CORS - restrict to specific origins in production
     allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
     CORS(app, origins=allowed_origins, supports_credentials=True)
 
+    # Blog feeds link to the frontend, which is the first allowed origin by default
+    app.config["FEED_SITE_URL"] = os.getenv("FEED_SITE_URL", allowed_origins[0])
+    app.config["FEED_TITLE"] = os.getenv("FEED_TITLE", "Blog")
+
     db.init_app(app)
     migrate.init_app(app, db)
 
     register_blueprints(app)
     register_error_handlers(app)
+    register_commands(app)
 
     # Serve static files
     @app.route("/static/<path:filename>")
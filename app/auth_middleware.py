@@ -3,9 +3,10 @@ Authentication middleware for JWT token verification.
 """
 
 from functools import wraps
-from flask import request, jsonify
+from flask import g, request, jsonify
 import jwt
 import os
+from app.database import db
 from app.models import User
 
 
@@ -85,6 +86,9 @@ def token_required(f):
         if error:
             return error
 
+        # The user row itself is loaded on first use (app.user_cache.current_user)
+        g.current_user_id = current_user_id
+
         # Pass the user_id to the route
         return f(current_user_id, *args, **kwargs)
 
@@ -112,6 +116,7 @@ def token_optional(f):
         # Ignore errors - optional auth means we accept None
         if current_user_id is None:
             current_user_id = None  # Explicit for clarity
+        g.current_user_id = current_user_id
 
         return f(current_user_id, *args, **kwargs)
 
@@ -137,8 +142,9 @@ def admin_required(f):
         if error:
             return error
 
-        # Check if user exists and has admin role
-        user = User.query.get(current_user_id)
+        # Check if user exists and has admin role; the row is kept for the route
+        g.current_user_id = current_user_id
+        g.current_user = user = db.session.get(User, current_user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
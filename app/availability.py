@@ -0,0 +1,170 @@
+"""
+Username and email availability.
+
+Each worker keeps a Bloom filter of the lower-cased usernames and emails of
+every user. A name the filter has never seen is certainly free, so most
+availability checks never reach the database; only possible hits (taken
+names and the occasional false positive, about AVAILABILITY_FALSE_POSITIVE_RATE)
+are confirmed with one indexed query.
+
+The filter is built from the `users` table on first use and extended with
+users created since, found by a primary-key range scan at most every
+AVAILABILITY_REFRESH_SECONDS, so signups handled by other workers or scripts
+are picked up too. Ids are assigned at insert but become visible at commit,
+so a user can appear below the highest id already seen: each scan starts
+AVAILABILITY_RESCAN_IDS below it, and the filter is rebuilt from scratch
+every AVAILABILITY_REBUILD_SECONDS to catch anything committed later still.
+Usernames and emails never change, and deleted users only leave extra bits
+set, which cost a database check but never a wrong answer. When the number
+of names outgrows the filter's capacity it is rebuilt larger.
+
+The unique constraints on `users` stay the source of truth: a signup that
+races another one with the same name fails on insert.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from sqlalchemy import func, or_, select
+from app.constants import (
+    AVAILABILITY_FALSE_POSITIVE_RATE,
+    AVAILABILITY_MIN_CAPACITY,
+    AVAILABILITY_REBUILD_SECONDS,
+    AVAILABILITY_REFRESH_SECONDS,
+    AVAILABILITY_RESCAN_IDS,
+)
+from app.database import db
+from app.models import User
+
+_LOAD_BATCH_SIZE = 5000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings."""
+
+    def __init__(self, capacity, false_positive_rate=AVAILABILITY_FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        positions = self._positions(value)
+        if self._has(positions):
+            # Already in (rescans add the same names again): only count new names
+            return
+        for position in positions:
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def _has(self, positions):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def __contains__(self, value):
+        return self._has(self._positions(value))
+
+
+_lock = threading.Lock()
+_state = {"filter": None, "last_id": 0, "checked_at": float("-inf"), "built_at": float("-inf")}
+
+
+def _key(kind, value):
+    return f"{kind}:{value.lower()}"
+
+
+def _add_users(bloom, after_id=0):
+    """Add users with an id greater than `after_id`; returns the highest id seen."""
+    last_id = after_id
+    while True:
+        rows = db.session.execute(
+            select(User.id, User.username, User.email)
+            .where(User.id > last_id)
+            .order_by(User.id)
+            .limit(_LOAD_BATCH_SIZE)
+        ).all()
+        for user_id, username, email in rows:
+            bloom.add(_key("username", username))
+            bloom.add(_key("email", email))
+            last_id = user_id
+        if len(rows) < _LOAD_BATCH_SIZE:
+            return last_id
+
+
+def _rebuild(now):
+    user_count = db.session.execute(select(func.count(User.id))).scalar_one()
+    # Two names per user, with room to double before the next rebuild
+    bloom = BloomFilter(max(AVAILABILITY_MIN_CAPACITY, 4 * user_count))
+    _state["last_id"] = _add_users(bloom)
+    _state["filter"] = bloom
+    _state["built_at"] = now
+
+
+def _ensure_loaded():
+    now = time.monotonic()
+    if _state["filter"] is not None and now - _state["checked_at"] < AVAILABILITY_REFRESH_SECONDS:
+        return
+    with _lock:
+        if _state["filter"] is None or now - _state["built_at"] >= AVAILABILITY_REBUILD_SECONDS:
+            _rebuild(now)
+        else:
+            # Rescan a window below the highest id seen, for users committed out of order
+            last_id = _add_users(_state["filter"], _state["last_id"] - AVAILABILITY_RESCAN_IDS)
+            _state["last_id"] = max(last_id, _state["last_id"])
+            if _state["filter"].count > _state["filter"].capacity:
+                _rebuild(now)
+        _state["checked_at"] = now
+
+
+def taken(username=None, email=None):
+    """
+    Which of the given username and email already belong to a user.
+
+    Names the filter has not seen are answered without a query; the others
+    are checked together with one indexed query. Matching is exact, like the
+    unique constraints.
+
+    Returns:
+        dict: {"username": bool, "email": bool} for the values given
+    """
+    _ensure_loaded()
+    bloom = _state["filter"]
+    values = {"username": username, "email": email}
+    result = {kind: False for kind, value in values.items() if value is not None}
+    maybe = {
+        kind: value for kind, value in values.items()
+        if value is not None and _key(kind, value) in bloom
+    }
+    if not maybe:
+        return result
+
+    columns = {"username": User.username, "email": User.email}
+    rows = db.session.execute(
+        select(User.username, User.email)
+        .where(or_(*(columns[kind] == value for kind, value in maybe.items())))
+        .limit(2)
+    ).all()
+    for row_username, row_email in rows:
+        if "username" in maybe and row_username == maybe["username"]:
+            result["username"] = True
+        if "email" in maybe and row_email == maybe["email"]:
+            result["email"] = True
+    return result
+
+
+def record(user):
+    """Add a newly committed user to this worker's filter."""
+    bloom = _state["filter"]
+    if bloom is None:
+        return
+    with _lock:
+        bloom.add(_key("username", user.username))
+        bloom.add(_key("email", user.email))
@@ -0,0 +1,287 @@
+"""
+Atom and JSON Feed documents for the newest blogs.
+
+Each worker keeps the newest BLOG_FEED_SIZE blogs pre-encoded as Atom entries
+and JSON Feed items, plus both assembled documents as bytes. Feed requests are
+answered from those bytes; the database is only read when the document has to
+change:
+- Writes in this worker patch the changed entries in place (blog_changed).
+- Writes in other workers bump the `blog_feed` cache version. A worker checks
+  it at most every BLOG_FEED_VERSION_CHECK_SECONDS and, when it moved,
+  reloads the window with one indexed top-N query.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+from flask import current_app, has_request_context, url_for
+from app.constants import BLOG_FEED_SIZE, BLOG_FEED_VERSION_CHECK_SECONDS
+from app.database import db
+from app.http_cache import compute_etag
+from app.markdown_cache import render_many
+from app.models import Blog, CacheVersion
+from app.pagination import encode_cursor, keyset_paginate
+from app.signals import blog_changed
+
+FEED_NAMESPACE = "blog_feed"
+
+FEED_MIMETYPES = {
+    "atom": "application/atom+xml",
+    "json": "application/feed+json",
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class FeedDocument:
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+@dataclass(frozen=True)
+class _Entry:
+    sort_key: tuple
+    updated_at: datetime
+    atom: str
+    json: str
+
+
+_lock = threading.Lock()
+_state = {
+    "entries": None,  # blog id -> _Entry, None until loaded
+    "documents": None,  # format -> FeedDocument
+    "version": None,
+    "changed_at": None,
+    "checked_at": float("-inf"),
+}
+
+
+def _utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite returns naive timestamps, which are stored in UTC
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _rfc3339(value):
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+def _site_url():
+    return current_app.config.get("FEED_SITE_URL", "").rstrip("/")
+
+
+def _self_url(kind):
+    if not has_request_context():
+        return None
+    endpoint = "blogs.get_blog_feed_atom" if kind == "atom" else "blogs.get_blog_feed_json"
+    return url_for(endpoint, _external=True)
+
+
+def _labels(blog):
+    return [tag["label"] for tag in blog.tags or [] if isinstance(tag, dict) and tag.get("label")]
+
+
+def _atom_entry(blog, entry_id, content_html):
+    parts = [
+        "<entry>",
+        f"<id>{escape(entry_id)}</id>",
+        f"<title>{escape(blog.title)}</title>",
+        f"<link rel=\"alternate\" href={quoteattr(blog.url)}/>",
+        f"<published>{_rfc3339(blog.publication_date)}</published>",
+        f"<updated>{_rfc3339(blog.updated_at)}</updated>",
+        f"<author><name>{escape(blog.author_name)}</name></author>",
+        *(f"<category term={quoteattr(label)}/>" for label in _labels(blog)),
+        f"<summary>{escape(blog.description)}</summary>",
+    ]
+    if content_html:
+        parts.append(f"<content type=\"html\">{escape(content_html)}</content>")
+    parts.append("</entry>")
+    return "".join(parts)
+
+
+def _json_item(blog, entry_id, content_html):
+    item = {
+        "id": entry_id,
+        "url": blog.url,
+        "title": blog.title,
+        "summary": blog.description,
+        "date_published": _rfc3339(blog.publication_date),
+        "date_modified": _rfc3339(blog.updated_at),
+        "authors": [{"name": blog.author_name}],
+        "tags": _labels(blog),
+    }
+    # JSON Feed requires content_html or content_text
+    if content_html:
+        item["content_html"] = content_html
+    else:
+        item["content_text"] = blog.description
+    if blog.image_url:
+        item["image"] = blog.image_url
+    return current_app.json.dumps(item, separators=(",", ":"))
+
+
+def _entries_for(blogs):
+    site = _site_url()
+    rendered = render_many(blog.content for blog in blogs)
+    entries = {}
+    for blog in blogs:
+        entry_id = f"{site}/blogs/{blog.id}"
+        content_html = rendered.get(blog.content or "")
+        entries[blog.id] = _Entry(
+            sort_key=(_utc(blog.publication_date), blog.id),
+            updated_at=_utc(blog.updated_at),
+            atom=_atom_entry(blog, entry_id, content_html),
+            json=_json_item(blog, entry_id, content_html),
+        )
+    return entries
+
+
+def _newest(limit, after=None):
+    """The newest `limit` blogs, optionally only those older than the `after` entry."""
+    cursor = encode_cursor(*after.sort_key) if after else None
+    blogs, _ = keyset_paginate(
+        Blog.query, Blog.publication_date, Blog.id, cursor=cursor, limit=limit
+    )
+    return blogs
+
+
+def _atom_document(entries, updated):
+    site = _site_url()
+    title = current_app.config.get("FEED_TITLE", "Blog")
+    self_url = _self_url("atom")
+    head = [
+        "<?xml version=\"1.0\" encoding=\"utf-8\"?>",
+        "<feed xmlns=\"http://www.w3.org/2005/Atom\">",
+        f"<id>{escape(site)}/blogs</id>",
+        f"<title>{escape(title)}</title>",
+        f"<updated>{_rfc3339(updated)}</updated>",
+        f"<link rel=\"alternate\" href={quoteattr(site + '/blogs')}/>",
+    ]
+    if self_url:
+        head.append(f"<link rel=\"self\" href={quoteattr(self_url)}/>")
+    return "".join([*head, *(entry.atom for entry in entries), "</feed>"]).encode("utf-8")
+
+
+def _json_document(entries):
+    dumps = current_app.json.dumps
+    header = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": current_app.config.get("FEED_TITLE", "Blog"),
+        "home_page_url": f"{_site_url()}/blogs",
+    }
+    self_url = _self_url("json")
+    if self_url:
+        header["feed_url"] = self_url
+    # Splice the pre-encoded items into the encoded header object
+    head = dumps(header, separators=(",", ":"))[:-1]
+    items = ",".join(entry.json for entry in entries)
+    return f"{head},\"items\":[{items}]}}".encode("utf-8")
+
+
+def _assemble(entries):
+    """Trim the window to BLOG_FEED_SIZE and encode both documents."""
+    ordered = sorted(entries.values(), key=lambda entry: entry.sort_key, reverse=True)
+    ordered = ordered[:BLOG_FEED_SIZE]
+    kept = {entry.sort_key[1]: entry for entry in ordered}
+
+    # A deletion can lower max(updated_at), so the time of the last feed
+    # change also counts towards Last-Modified
+    candidates = [entry.updated_at for entry in ordered] + [_utc(_state["changed_at"])]
+    updated = max((value for value in candidates if value is not None), default=_EPOCH)
+
+    documents = {}
+    for kind, body in (("atom", _atom_document(ordered, updated)), ("json", _json_document(ordered))):
+        documents[kind] = FeedDocument(
+            body=body, etag=compute_etag(body), last_modified=updated
+        )
+    return kept, documents
+
+
+def _reload(version, changed_at):
+    _state["changed_at"] = changed_at
+    _state["entries"], _state["documents"] = _assemble(_entries_for(_newest(BLOG_FEED_SIZE)))
+    _state["version"] = version
+
+
+def _stored_version():
+    row = db.session.execute(
+        db.select(CacheVersion.version, CacheVersion.updated_at).filter_by(name=FEED_NAMESPACE)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def get_feed(kind):
+    """
+    Current feed document.
+
+    Args:
+        kind: "atom" or "json"
+
+    Returns:
+        FeedDocument
+    """
+    now = time.monotonic()
+    if now - _state["checked_at"] >= BLOG_FEED_VERSION_CHECK_SECONDS or _state["documents"] is None:
+        version, changed_at = _stored_version()
+        with _lock:
+            if version != _state["version"] or _state["documents"] is None:
+                _reload(version, changed_at)
+            _state["checked_at"] = now
+    return _state["documents"][kind]
+
+
+def _patch(ids, action):
+    """Apply this worker's own blog change to the window and re-encode the documents."""
+    version = CacheVersion.bump(FEED_NAMESPACE)
+    # The row's updated_at, not this worker's clock, so every worker renders
+    # the same <updated> and ETag for a feed version
+    _, changed_at = _stored_version()
+
+    with _lock:
+        if _state["entries"] is None:
+            return
+
+        entries = dict(_state["entries"])
+        if action == "deleted":
+            for blog_id in ids:
+                entries.pop(blog_id, None)
+        else:
+            # Only the newest changed blogs can enter the window, plus those
+            # already in it; large batches (imports) never load the rest
+            newest = (
+                Blog.query.filter(Blog.id.in_(ids))
+                .order_by(Blog.publication_date.desc(), Blog.id.desc())
+                .limit(BLOG_FEED_SIZE)
+                .all()
+            )
+            in_window = [blog_id for blog_id in ids if blog_id in entries]
+            if in_window:
+                newest += Blog.query.filter(Blog.id.in_(in_window)).all()
+            entries.update(_entries_for(newest))
+
+        if len(entries) < BLOG_FEED_SIZE and entries:
+            # Refill from just below the oldest remaining entry
+            oldest = min(entries.values(), key=lambda entry: entry.sort_key)
+            entries.update(_entries_for(_newest(BLOG_FEED_SIZE - len(entries), after=oldest)))
+        elif not entries:
+            entries = _entries_for(_newest(BLOG_FEED_SIZE))
+
+        _state["changed_at"] = changed_at
+        _state["entries"], _state["documents"] = _assemble(entries)
+
+        # Only claim the new version if nobody else changed the feed in
+        # between; otherwise the next check reloads the whole window
+        if version is not None and _state["version"] == version - 1:
+            _state["version"] = version
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, ids=(), action=None, **kwargs):
+    _patch(list(ids), action)
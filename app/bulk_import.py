@@ -0,0 +1,235 @@
+"""
+Bulk import of blogs and courses from newline-delimited JSON.
+
+Lines are read as a stream and handled in batches:
+- each line is parsed and checked with the same rules as POST /blogs and
+  POST /courses, and invalid lines are reported instead of aborting the import;
+- the valid rows of a batch are written with one executemany INSERT, their
+  tag rows are synced, and the batch is committed;
+- blog_changed/course_changed is sent once per batch, which updates the
+  search index, caches and feeds like any other write.
+"""
+
+import json
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from app.constants import IMPORT_BATCH_SIZE, IMPORT_MAX_REPORTED_ERRORS
+from app.database import db
+from app.models import Blog, Course
+from app.signals import blog_changed, course_changed
+from app.tags import sync_tags
+from app.validation import validate_blog_data, validate_course_data
+
+IMPORT_KINDS = ("blogs", "courses")
+
+
+class _RowError(ValueError):
+    pass
+
+
+def _optional_list(data, field):
+    value = data.get(field)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise _RowError(f"{field} must be a list")
+    return value
+
+
+def _blog_mapping(data):
+    is_valid, error = validate_blog_data(data)
+    if not is_valid:
+        raise _RowError(error)
+    return {
+        "title": data["title"],
+        "author_name": data["author_name"],
+        "email": data["email"],
+        "url": data["url"],
+        "description": data["description"],
+        "content": data["content"],
+        "tags": _optional_list(data, "tags"),
+        "image_url": data.get("image_url"),
+        "image_alt": data.get("image_alt"),
+    }
+
+
+def _decimal(data, field):
+    # Already checked by validate_course_data (finite and within Numeric(4, 2))
+    return Decimal(str(data[field]))
+
+
+def _course_mapping(data):
+    is_valid, error = validate_course_data(data)
+    if not is_valid:
+        raise _RowError(error)
+    if data.get("summary") is not None and not isinstance(data["summary"], dict):
+        raise _RowError("summary must be an object")
+    return {
+        "name": data["name"],
+        "price": _decimal(data, "price"),
+        "discount": _decimal(data, "discount"),
+        "topic": data["topic"],
+        "level": data["level"],
+        "description": data["description"],
+        "tags": _optional_list(data, "tags"),
+        "summary": data.get("summary"),
+        "content": _optional_list(data, "content") if data.get("content") is not None else None,
+        "image_url": data.get("image_url"),
+        "image_alt": data.get("image_alt"),
+    }
+
+
+# kind -> (model, tag kind, row mapper, change signal)
+IMPORTERS = {
+    "blogs": (Blog, "blog", _blog_mapping, blog_changed),
+    "courses": (Course, "course", _course_mapping, course_changed),
+}
+
+
+class ImportReport:
+    """Counts and per-line errors of one import."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _parse(raw_line, mapper):
+    if isinstance(raw_line, bytes):
+        try:
+            raw_line = raw_line.decode("utf-8")
+        except UnicodeDecodeError:
+            raise _RowError("Line is not valid UTF-8")
+    try:
+        data = json.loads(raw_line)
+    except ValueError as e:
+        raise _RowError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise _RowError("Each line must be a JSON object")
+    return mapper(data)
+
+
+def _existing_course_names(names):
+    if not names:
+        return set()
+    return set(db.session.execute(select(Course.name).where(Course.name.in_(names))).scalars())
+
+
+def _insert(model, rows):
+    """Insert the rows in one executemany statement and return their ids."""
+    return list(db.session.execute(insert(model).returning(model.id), rows).scalars())
+
+
+def _write_batch(kind, batch, report):
+    """
+    Insert one batch of (line number, mapping) pairs and commit it.
+
+    Returns:
+        list[int]: Ids of the inserted rows
+    """
+    model, tag_kind, _, _ = IMPORTERS[kind]
+
+    # Line errors are reported once the batch is committed: if it fails,
+    # import_ndjson reports every line of the batch instead, and only once
+    errors = []
+    if kind == "courses":
+        # Course names are unique: report duplicates instead of failing the batch
+        taken = _existing_course_names([row["name"] for _, row in batch])
+        unique = []
+        for line_number, row in batch:
+            if row["name"] in taken:
+                errors.append((line_number, f"A course with the name '{row['name']}' already exists"))
+            else:
+                taken.add(row["name"])
+                unique.append((line_number, row))
+        batch = unique
+
+    if not batch:
+        for line_number, message in errors:
+            report.add_error(line_number, message)
+        return []
+
+    try:
+        with db.session.begin_nested():
+            ids = _insert(model, [row for _, row in batch])
+    except DBAPIError:
+        # A row the checks let through was refused (a unique value taken by a
+        # concurrent writer, a value the database rejects): retry row by row
+        # so only the offending lines fail
+        ids = []
+        for line_number, row in batch:
+            try:
+                with db.session.begin_nested():
+                    ids.extend(_insert(model, [row]))
+            except DBAPIError as e:
+                errors.append((line_number, f"Database error: {e.orig}"))
+
+    sync_tags(tag_kind, ids)
+    db.session.commit()
+    report.imported += len(ids)
+    for line_number, message in errors:
+        report.add_error(line_number, message)
+    return ids
+
+
+def import_ndjson(kind, lines, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import blogs or courses from NDJSON lines.
+
+    Args:
+        kind: "blogs" or "courses"
+        lines: Iterable of lines (str or bytes), e.g. an open file or request.stream
+        batch_size: Number of valid rows inserted per statement and commit
+
+    Returns:
+        ImportReport
+    """
+    _, _, mapper, signal = IMPORTERS[kind]
+    app = current_app._get_current_object()
+    report = ImportReport(kind)
+
+    def write(batch):
+        try:
+            ids = _write_batch(kind, batch, report)
+        except Exception as e:
+            db.session.rollback()
+            for line_number, _ in batch:
+                report.add_error(line_number, f"Batch failed: {e}")
+            return
+        if ids:
+            signal.send(app, ids=ids, action="created")
+
+    batch = []
+    for line_number, raw_line in enumerate(lines, start=1):
+        if not raw_line.strip():
+            continue
+        try:
+            batch.append((line_number, _parse(raw_line, mapper)))
+        except _RowError as e:
+            report.add_error(line_number, str(e))
+            continue
+        if len(batch) >= batch_size:
+            write(batch)
+            batch = []
+
+    if batch:
+        write(batch)
+    return report
@@ -0,0 +1,109 @@
+"""
+Per-process cache of encoded catalog responses (/courses, /courses/<id>,
+/courses/<topic> and the lesson endpoints).
+
+Entries are dropped locally on every course or blog change. Other workers
+notice the change through the `catalog` row in `cache_versions`, which they
+re-read at most every CATALOG_VERSION_CHECK_SECONDS. A response built while
+the entries were dropped may hold rows read before the change, so it is
+served but not cached.
+"""
+
+import threading
+import time
+from flask import current_app, jsonify, request
+from app.cache import TTLCache
+from app.constants import (
+    CATALOG_CACHE_MAX_ENTRIES,
+    CATALOG_CACHE_TTL_SECONDS,
+    CATALOG_VERSION_CHECK_SECONDS,
+)
+from app.models import CacheVersion
+from app.signals import blog_changed, course_changed
+
+CATALOG_NAMESPACE = "catalog"
+
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_MAX_ENTRIES, ttl=CATALOG_CACHE_TTL_SECONDS)
+
+_state_lock = threading.Lock()
+# generation counts the times this worker dropped its entries
+_state = {"version": None, "checked_at": float("-inf"), "generation": 0}
+
+
+def request_cache_key():
+    """Cache key for the current request: path plus normalized query string."""
+    return (request.path, tuple(sorted(request.args.items(multi=True))))
+
+
+def _ensure_fresh():
+    """Drop local entries if another worker bumped the catalog version."""
+    now = time.monotonic()
+    if now - _state["checked_at"] < CATALOG_VERSION_CHECK_SECONDS:
+        return
+
+    version = CacheVersion.current(CATALOG_NAMESPACE)
+    with _state_lock:
+        if version != _state["version"]:
+            _clear()
+            _state["version"] = version
+        _state["checked_at"] = now
+
+
+def _clear():
+    # Callers hold _state_lock
+    catalog_cache.clear()
+    _state["generation"] += 1
+
+
+def catalog_version():
+    """Shared catalog version as last seen by this worker (re-read when due)."""
+    _ensure_fresh()
+    return _state["version"]
+
+
+def cached_json(key, builder):
+    """
+    Serve a JSON response from the catalog cache.
+
+    Args:
+        key: Cache key, usually request_cache_key()
+        builder: Callable returning the JSON-serializable payload on a miss.
+            Exceptions propagate and nothing is cached.
+
+    Returns:
+        Response with the encoded payload
+    """
+    _ensure_fresh()
+    body = catalog_cache.get(key)
+    if body is None:
+        generation = _state["generation"]
+        body = jsonify(builder()).get_data()
+        with _state_lock:
+            if _state["generation"] == generation:
+                catalog_cache.set(key, body)
+    return current_app.response_class(body, mimetype="application/json")
+
+
+def invalidate_catalog():
+    """Clear this worker's entries and bump the shared version for the others."""
+    with _state_lock:
+        _clear()
+    CacheVersion.bump(CATALOG_NAMESPACE)
+
+    with _state_lock:
+        _state["checked_at"] = float("-inf")
+
+
+def cache_stats():
+    return catalog_cache.stats()
+
+
+@course_changed.connect
+def _on_course_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, **kwargs):
+    # The /home snapshot embeds blogs and follows the catalog version
+    invalidate_catalog()
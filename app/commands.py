@@ -0,0 +1,98 @@
+"""
+Flask CLI commands (`flask <group> <command>`).
+"""
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from app.constants import IMPORT_BATCH_SIZE, IMPORT_MAX_BATCH_SIZE
+
+search_cli = AppGroup("search", help="Full-text search index maintenance.")
+tags_cli = AppGroup("tags", help="Normalized tag index maintenance.")
+markdown_cli = AppGroup("markdown", help="Rendered markdown cache maintenance.")
+related_cli = AppGroup("related", help="Related-content neighbour lists.")
+idempotency_cli = AppGroup("idempotency", help="Stored Idempotency-Key responses.")
+
+
+@search_cli.command("reindex")
+def reindex_command():
+    """Rebuild the search index from all courses and blogs."""
+    from app.search import reindex_all
+
+    counts = reindex_all()
+    click.echo(f"Indexed {counts['course']} courses and {counts['blog']} blogs.")
+
+
+@tags_cli.command("rebuild")
+def rebuild_tags_command():
+    """Resync the tag tables from Course.tags and Blog.tags."""
+    from app.tags import rebuild_all
+
+    counts = rebuild_all()
+    click.echo(f"Synced tags for {counts['course']} courses and {counts['blog']} blogs.")
+
+
+@markdown_cli.command("warm")
+def warm_markdown_command():
+    """Render every blog and lesson that has no stored rendering yet."""
+    from app.markdown_cache import warm_all
+
+    counts = warm_all()
+    click.echo(f"Rendered {counts['course']} courses and {counts['blog']} blogs.")
+
+
+@markdown_cli.command("prune")
+def prune_markdown_command():
+    """Delete stored renderings that no course or blog uses anymore."""
+    from app.markdown_cache import prune
+
+    click.echo(f"Deleted {prune()} unused renderings.")
+
+
+@related_cli.command("rebuild")
+@click.option("--type", "kind", type=click.Choice(["course", "blog"]), help="Only rebuild one kind.")
+def rebuild_related_command(kind):
+    """Recompute the related courses and blogs."""
+    from app.related import rebuild, rebuild_all
+
+    counts = {kind: rebuild(kind)} if kind else rebuild_all()
+    click.echo(", ".join(f"{count} {name} lists" for name, count in counts.items()) + " rebuilt.")
+
+
+@idempotency_cli.command("purge")
+def purge_idempotency_command():
+    """Delete stored Idempotency-Key responses past their expiry."""
+    from app.idempotency import purge_expired
+
+    click.echo(f"Deleted {purge_expired()} expired idempotency keys.")
+
+
+@click.command("import")
+@click.argument("kind", type=click.Choice(["blogs", "courses"]))
+@click.argument("source", type=click.File("rb"))
+@click.option(
+    "--batch-size",
+    default=IMPORT_BATCH_SIZE,
+    show_default=True,
+    type=click.IntRange(1, IMPORT_MAX_BATCH_SIZE),
+    help="Rows inserted per statement and commit.",
+)
+@with_appcontext
+def import_command(kind, source, batch_size):
+    """Import blogs or courses from an NDJSON file ('-' reads stdin)."""
+    from app.bulk_import import import_ndjson
+
+    report = import_ndjson(kind, source, batch_size=batch_size)
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    if report.failed > len(report.errors):
+        click.echo(f"... {report.failed - len(report.errors)} more errors not shown", err=True)
+    click.echo(f"Imported {report.imported} {kind}, {report.failed} failed.")
+
+
+def register_commands(app):
+    app.cli.add_command(search_cli)
+    app.cli.add_command(tags_cli)
+    app.cli.add_command(markdown_cli)
+    app.cli.add_command(related_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(import_command)
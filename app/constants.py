@@ -20,4 +20,80 @@ MAX_BLOG_TITLE_LENGTH = 100
 MAX_BLOG_DESCRIPTION_LENGTH = 500
 MAX_BLOG_CONTENT_LENGTH = 50000
 MAX_COURSE_NAME_LENGTH = 100
+MAX_COURSE_TOPIC_LENGTH = 100
+MAX_COURSE_LEVEL_LENGTH = 100
+MAX_IMAGE_FIELD_LENGTH = 255
+# Course.price and Course.discount are Numeric(4, 2)
+MAX_COURSE_PRICE = 99.99
 MAX_CONTACT_MESSAGE_LENGTH = 1000
+# Tag.slug/Tag.label are String(100), Tag.color is String(20)
+MAX_TAG_LABEL_LENGTH = 100
+MAX_TAG_COLOR_LENGTH = 20
+
+# Pagination
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Catalog cache (per worker)
+CATALOG_CACHE_MAX_ENTRIES = 512
+CATALOG_CACHE_TTL_SECONDS = 300
+CATALOG_VERSION_CHECK_SECONDS = 2
+
+# Lessons
+MAX_LESSON_SLICE = 20
+
+# Home feed snapshot
+HOME_FEED_MAX_AGE_SECONDS = 300
+
+# Streaming responses
+STREAM_BATCH_SIZE = 200
+
+# Rendered markdown (per-worker layer in front of the rendered_markdown table)
+MARKDOWN_CACHE_MAX_ENTRIES = 4096
+MARKDOWN_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Blog feeds (Atom / JSON Feed)
+BLOG_FEED_SIZE = 20
+BLOG_FEED_VERSION_CHECK_SECONDS = 5
+
+# Related content (see app.related)
+RELATED_TOP_K = 10
+RELATED_DEFAULT_LIMIT = 5
+RELATED_TAG_WEIGHT = 0.4
+RELATED_MAX_FEATURES = 20000
+RELATED_BLOCK_SIZE = 512
+RELATED_REBUILD_DELAY_SECONDS = 30
+RELATED_VERSION_CHECK_SECONDS = 10
+
+# Write-behind view counters (see app.content_stats)
+VIEW_FLUSH_INTERVAL_SECONDS = 10
+VIEW_FLUSH_MAX_PENDING = 1000
+
+# Bulk NDJSON imports (see app.bulk_import)
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_BATCH_SIZE = 10000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+IMPORT_MAX_CONTENT_LENGTH = 200 * 1024 * 1024  # 200MB
+
+# Serialized user cache (see app.user_cache)
+USER_CACHE_MAX_ENTRIES = 10000
+USER_CACHE_TTL_SECONDS = 5 * 60
+USER_CACHE_VERSION_CHECK_SECONDS = 2
+
+# Batch list changes (PUT /users/<id>/favourite-courses, /saved-blogs)
+MAX_LIST_CHANGE_ITEMS = 1000
+
+# Username/email availability filter (see app.availability)
+AVAILABILITY_FALSE_POSITIVE_RATE = 0.01
+AVAILABILITY_MIN_CAPACITY = 1024
+AVAILABILITY_REFRESH_SECONDS = 2
+AVAILABILITY_RESCAN_IDS = 1000
+AVAILABILITY_REBUILD_SECONDS = 60 * 60
+
+# Idempotency-Key replays (see app.idempotency)
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_WAIT_SECONDS = 10
+IDEMPOTENCY_POLL_SECONDS = 0.1
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = 60
+IDEMPOTENCY_GC_INTERVAL_SECONDS = 10 * 60
@@ -0,0 +1,186 @@
+"""
+Write-behind view counters for courses and blogs.
+
+Views are counted in a per-worker buffer and added to `content_stats` by a
+background thread, one batched upsert per flush. A flush happens every
+VIEW_FLUSH_INTERVAL_SECONDS, as soon as VIEW_FLUSH_MAX_PENDING views are
+buffered, and once more when the process exits normally, so a graceful
+restart does not lose counts. A hard kill loses at most one interval.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+from flask import current_app
+from sqlalchemy import func, insert, select, update
+from app.constants import VIEW_FLUSH_INTERVAL_SECONDS, VIEW_FLUSH_MAX_PENDING
+from app.database import db
+from app.models import ContentStats
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_OPTIONS = ("stats",)
+
+_UPSERT_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_pending = Counter()
+_pending_total = {"views": 0}
+_wakeup = threading.Event()
+_flusher = {"thread": None, "app": None}
+
+
+class InvalidInclude(ValueError):
+    """Raised when the `include` query parameter names an unknown option."""
+
+
+def parse_include(args):
+    """
+    Read `include` (comma-separated) from query args.
+
+    Returns:
+        set[str]: Requested options
+
+    Raises:
+        InvalidInclude: If an option is not one of INCLUDE_OPTIONS
+    """
+    options = {option.strip() for option in args.get("include", "").split(",") if option.strip()}
+    unknown = options.difference(INCLUDE_OPTIONS)
+    if unknown:
+        raise InvalidInclude(
+            f"Unknown include option(s): {', '.join(sorted(unknown))}. "
+            f"Valid options: {', '.join(INCLUDE_OPTIONS)}"
+        )
+    return options
+
+
+def _ensure_flusher():
+    if _flusher["thread"] is not None:
+        return
+    with _lock:
+        if _flusher["thread"] is None:
+            _flusher["app"] = current_app._get_current_object()
+            thread = threading.Thread(target=_flush_loop, name="view-counter-flush", daemon=True)
+            _flusher["thread"] = thread
+            thread.start()
+
+
+def record_view(kind, item_id):
+    """Count one view of a course or blog. Never touches the database."""
+    _ensure_flusher()
+    with _lock:
+        _pending[(kind, item_id)] += 1
+        _pending_total["views"] += 1
+        full = _pending_total["views"] >= VIEW_FLUSH_MAX_PENDING
+    if full:
+        _wakeup.set()
+
+
+def _upsert_statement(dialect):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(ContentStats.__table__)
+
+
+def _write(deltas):
+    rows = [
+        {"kind": kind, "item_id": item_id, "views": views}
+        for (kind, item_id), views in deltas.items()
+    ]
+    table = ContentStats.__table__
+
+    with db.engine.begin() as connection:
+        statement = _upsert_statement(connection.dialect.name)
+        if statement is None:
+            # No native upsert: update existing rows, insert the others
+            for row in rows:
+                result = connection.execute(
+                    update(table)
+                    .where(table.c.kind == row["kind"], table.c.item_id == row["item_id"])
+                    .values(views=table.c.views + row["views"], updated_at=func.now())
+                )
+                if result.rowcount == 0:
+                    connection.execute(insert(table), row)
+            return
+
+        for start in range(0, len(rows), _UPSERT_BATCH_SIZE):
+            batch = statement.values(rows[start:start + _UPSERT_BATCH_SIZE])
+            connection.execute(
+                batch.on_conflict_do_update(
+                    index_elements=[table.c.kind, table.c.item_id],
+                    set_={
+                        "views": table.c.views + batch.excluded.views,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+
+def flush(app=None):
+    """
+    Add buffered views to `content_stats`.
+
+    On failure the views go back into the buffer for the next flush.
+
+    Returns:
+        int: Number of views written
+    """
+    with _lock:
+        deltas = Counter(_pending)
+        _pending.clear()
+        _pending_total["views"] = 0
+    if not deltas:
+        return 0
+
+    app = app or _flusher["app"] or current_app._get_current_object()
+    try:
+        with app.app_context():
+            _write(deltas)
+    except Exception:
+        with _lock:
+            _pending.update(deltas)
+            _pending_total["views"] += sum(deltas.values())
+        logger.exception("Failed to flush %d buffered views", sum(deltas.values()))
+        return 0
+    return sum(deltas.values())
+
+
+def _flush_loop():
+    while True:
+        _wakeup.wait(VIEW_FLUSH_INTERVAL_SECONDS)
+        _wakeup.clear()
+        flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    if _flusher["app"] is not None:
+        flush()
+
+
+def view_counts(kind, ids):
+    """
+    Views per item: the stored total plus this worker's unflushed views.
+
+    Returns:
+        dict: item id -> views (0 for items never viewed)
+    """
+    stored = dict(
+        db.session.execute(
+            select(ContentStats.item_id, ContentStats.views).where(
+                ContentStats.kind == kind, ContentStats.item_id.in_(ids)
+            )
+        ).all()
+    )
+    with _lock:
+        return {item_id: stored.get(item_id, 0) + _pending[(kind, item_id)] for item_id in ids}
+
+
+def item_stats(kind, item_id):
+    """Stats object returned by ?include=stats."""
+    return {"views": view_counts(kind, [item_id])[item_id]}
@@ -0,0 +1,169 @@
+"""
+Precomputed /home payload.
+
+The landing page payload is built once into encoded JSON bytes and served
+from memory. A snapshot is rebuilt when:
+- a course or blog changes (the shared catalog version moves), or
+- it is older than HOME_FEED_MAX_AGE_SECONDS, which also picks up
+  popularity changes for the "most_owned" policy.
+
+Selection is configured through app config (set from the environment in
+create_app):
+- HOME_FEED_POLICY: "newest" (default), "most_owned" or "editor_picks"
+- HOME_FEED_SIZE: Number of courses and of blogs (default 4)
+- HOME_EDITOR_PICK_COURSES / HOME_EDITOR_PICK_BLOGS: Ordered id lists used by
+  "editor_picks"; remaining slots are filled with the newest items
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from flask import current_app, jsonify
+from sqlalchemy import func
+from app.catalog_cache import catalog_version
+from app.constants import HOME_FEED_MAX_AGE_SECONDS
+from app.database import db
+from app.http_cache import compute_etag
+from app.models import Blog, Course, OwnedCourse
+from app.signals import blog_changed, course_changed
+
+
+@dataclass(frozen=True)
+class HomeSnapshot:
+    body: bytes
+    etag: str
+    version: int
+    built_at: float
+
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def _newest_courses(limit, exclude=()):
+    query = Course.query.options(Course.load_only_fields(Course.CARD_FIELDS))
+    if exclude:
+        query = query.filter(Course.id.notin_(exclude))
+    return query.order_by(Course.created_at.desc(), Course.id.desc()).limit(limit).all()
+
+
+def _newest_blogs(limit, exclude=()):
+    query = Blog.query.options(Blog.load_only_fields(Blog.SUMMARY_FIELDS))
+    if exclude:
+        query = query.filter(Blog.id.notin_(exclude))
+    return query.order_by(Blog.publication_date.desc(), Blog.id.desc()).limit(limit).all()
+
+
+def _picked(model, fields, ids):
+    """Rows for `ids`, in the order given."""
+    if not ids:
+        return []
+    rows = model.query.options(model.load_only_fields(fields)).filter(model.id.in_(ids)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[row_id] for row_id in ids if row_id in by_id]
+
+
+def _most_owned_courses(limit):
+    # Counted on the (course_id, user_id) index of the ownership table
+    owners = (
+        db.select(OwnedCourse.course_id, func.count().label("total"))
+        .group_by(OwnedCourse.course_id)
+        .subquery()
+    )
+    courses = (
+        Course.query.options(Course.load_only_fields(Course.CARD_FIELDS))
+        .join(owners, owners.c.course_id == Course.id)
+        .order_by(owners.c.total.desc(), Course.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    if len(courses) < limit:
+        courses += _newest_courses(limit - len(courses), exclude=[c.id for c in courses])
+    return courses
+
+
+def select_home_content(policy, size, course_picks=(), blog_picks=()):
+    """
+    Pick the courses and blogs shown on the landing page. Unknown policies
+    fall back to "newest".
+
+    Returns:
+        tuple: (courses: list[Course], blogs: list[Blog])
+    """
+    if policy == "most_owned":
+        return _most_owned_courses(size), _newest_blogs(size)
+
+    if policy == "editor_picks":
+        courses = _picked(Course, Course.CARD_FIELDS, list(course_picks)[:size])
+        blogs = _picked(Blog, Blog.SUMMARY_FIELDS, list(blog_picks)[:size])
+        if len(courses) < size:
+            courses += _newest_courses(size - len(courses), exclude=[c.id for c in courses])
+        if len(blogs) < size:
+            blogs += _newest_blogs(size - len(blogs), exclude=[b.id for b in blogs])
+        return courses, blogs
+
+    return _newest_courses(size), _newest_blogs(size)
+
+
+def _build(version):
+    config = current_app.config
+    courses, blogs = select_home_content(
+        config.get("HOME_FEED_POLICY", "newest"),
+        config.get("HOME_FEED_SIZE", 4),
+        config.get("HOME_EDITOR_PICK_COURSES", ()),
+        config.get("HOME_EDITOR_PICK_BLOGS", ()),
+    )
+    body = jsonify(
+        {
+            "courses": [course.to_card_dict() for course in courses],
+            "blogs": [blog.to_dict(Blog.SUMMARY_FIELDS) for blog in blogs],
+        }
+    ).get_data()
+    return HomeSnapshot(body=body, etag=compute_etag(body), version=version, built_at=time.monotonic())
+
+
+def _is_current(snapshot, version):
+    return (
+        snapshot is not None
+        and snapshot.version == version
+        and time.monotonic() - snapshot.built_at < HOME_FEED_MAX_AGE_SECONDS
+    )
+
+
+def get_home_snapshot():
+    """
+    Current snapshot, rebuilding it if stale.
+
+    While one thread rebuilds, others keep serving the previous snapshot.
+    """
+    global _snapshot
+
+    version = catalog_version()
+    snapshot = _snapshot
+    if _is_current(snapshot, version):
+        return snapshot
+
+    # Only one thread rebuilds; the others serve the old snapshot if there is one
+    if not _lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        if not _is_current(_snapshot, version):
+            _snapshot = _build(version)
+        return _snapshot
+    finally:
+        _lock.release()
+
+
+def invalidate_home_snapshot():
+    global _snapshot
+    _snapshot = None
+
+
+@course_changed.connect
+def _on_course_changed(sender, **kwargs):
+    invalidate_home_snapshot()
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, **kwargs):
+    invalidate_home_snapshot()
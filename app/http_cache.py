@@ -0,0 +1,74 @@
+"""
+HTTP validators (ETag / Last-Modified) and conditional GET handling.
+
+Routes compute validators from cheap metadata (a row's updated_at, or the
+shared catalog version for collections, which needs no query on this worker
+most of the time) and only build the body when the client's cached copy is
+stale.
+"""
+
+import hashlib
+from datetime import timezone
+from flask import make_response, request
+
+
+def compute_etag(*parts):
+    """Build a strong ETag value from the given parts."""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite returns naive timestamps, which are stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Check the request's conditional headers against the current validators.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+
+    last_modified = _as_utc(last_modified)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+
+    return False
+
+
+def conditional_response(etag, last_modified, build_response):
+    """
+    Answer a GET conditionally.
+
+    Args:
+        etag: ETag value from compute_etag()
+        last_modified: datetime of the last change, or None
+        build_response: Callable returning the full response (any value a
+            view may return); only called when the client copy is stale
+
+    Returns:
+        Response: 304 with validators, or the built response with validators
+    """
+    last_modified = _as_utc(last_modified)
+
+    if is_not_modified(etag, last_modified):
+        response = make_response("", 304)
+    else:
+        response = make_response(build_response())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients must revalidate, but may keep the body
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,264 @@
+"""
+Idempotency-Key support for mutating endpoints.
+
+A client that may retry a POST sends an `Idempotency-Key` header with a value
+unique to the operation (a UUID, say). The first request with a key claims it
+by inserting an `idempotency_keys` row and runs normally; its response is then
+stored in the row. A retry with the same key:
+
+- replays the stored response without running the view again,
+- waits up to IDEMPOTENCY_WAIT_SECONDS if the first request is still running,
+  then replays its response (or answers 409 if it is still not done),
+- answers 422 if the method, path or body differ from the first request.
+
+Keys are scoped to the authenticated user, so users cannot see each other's
+responses; anonymous requests share one scope, where the body check means a
+replay is only served to a client sending the very same request.
+
+Responses with a 5xx status and exceptions release the key, so the retry
+runs the view again. A request that died without releasing its key is taken
+over after IDEMPOTENCY_LOCK_TIMEOUT_SECONDS. Stored responses are kept for
+IDEMPOTENCY_TTL_SECONDS and deleted by a background thread (or
+`flask idempotency purge`).
+
+Key rows are written on their own connection and committed right away, so
+other workers see the claim while the view's transaction is still open.
+
+Stored responses are kept in plain text, so views whose responses carry
+credentials (POST /signup returns a JWT) must not be decorated.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import Response, current_app, g, jsonify, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.constants import (
+    IDEMPOTENCY_GC_INTERVAL_SECONDS,
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+    IDEMPOTENCY_POLL_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+)
+from app.database import db
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# A claim is retried when the row it collided with was released, expired or abandoned
+_CLAIM_ATTEMPTS = 3
+
+_table = IdempotencyKey.__table__
+_lock = threading.Lock()
+_collector = {"thread": None, "app": None}
+
+
+def _now():
+    # Aware UTC: the key columns are timestamptz, so Postgres does not read
+    # the value in the session time zone
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value):
+    # SQLite returns the stored UTC values without a time zone
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _scope():
+    user_id = g.get("current_user_id")
+    return f"user:{user_id}" if user_id is not None else "anonymous"
+
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _row_filter(scope, key):
+    return (_table.c.scope == scope) & (_table.c.key == key)
+
+
+def _claim(scope, key, request_hash):
+    """
+    Insert the in-flight row of a key.
+
+    Returns:
+        datetime|None: Time of the claim (identifies it), or None if the key
+            already has a row
+    """
+    now = _now()
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(_table).values(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                created_at=now,
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            ))
+    except IntegrityError:
+        return None
+    return now
+
+
+def _read(scope, key):
+    with db.engine.connect() as connection:
+        return connection.execute(select(_table).where(_row_filter(scope, key))).first()
+
+
+def _release(scope, key, created_at):
+    """Delete a key row, if it is still the claim made at `created_at`."""
+    with db.engine.begin() as connection:
+        connection.execute(
+            delete(_table).where(_row_filter(scope, key), _table.c.created_at == created_at)
+        )
+
+
+def _store(scope, key, claimed_at, response):
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(_table)
+            .where(_row_filter(scope, key), _table.c.created_at == claimed_at)
+            .values(
+                status_code=response.status_code,
+                response_body=response.get_data(as_text=True),
+                mimetype=response.mimetype,
+                expires_at=_now() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+
+
+def _wait(scope, key):
+    """Poll an in-flight key until it completes, disappears or the wait times out."""
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        row = _read(scope, key)
+        if row is None or row.status_code is not None or time.monotonic() >= deadline:
+            return row
+        time.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+
+def _replay(row):
+    response = Response(row.response_body, status=row.status_code, mimetype=row.mimetype)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _in_progress():
+    return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409
+
+
+def idempotent(view):
+    """
+    Honor the Idempotency-Key header on a view.
+
+    Put it below the auth decorator, so the key is scoped to the user:
+
+        @bp.route("/purchase", methods=["POST"])
+        @token_required
+        @idempotent
+        def purchase_courses(current_user_id): ...
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key.strip() or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return jsonify({
+                "error": f"{HEADER} must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+            }), 400
+
+        _ensure_collector()
+        scope, request_hash = _scope(), _request_hash()
+
+        for _ in range(_CLAIM_ATTEMPTS):
+            claimed_at = _claim(scope, key, request_hash)
+            if claimed_at is not None:
+                break
+            existing = _read(scope, key)
+            if existing is None:
+                continue
+            if _as_utc(existing.expires_at) < _now():
+                _release(scope, key, existing.created_at)
+                continue
+            if existing.request_hash != request_hash:
+                return jsonify({"error": f"{HEADER} was already used for a different request"}), 422
+
+            if existing.status_code is None:
+                existing = _wait(scope, key)
+                if existing is None:
+                    # The first request failed and released the key: run again
+                    continue
+            if existing.status_code is not None:
+                return _replay(existing)
+
+            stale_before = _now() - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+            if _as_utc(existing.created_at) < stale_before:
+                # The first request died without releasing its key
+                _release(scope, key, existing.created_at)
+                continue
+            return _in_progress()
+        else:
+            return _in_progress()
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release(scope, key, claimed_at)
+            raise
+
+        # Only this claim's row is touched, in case it was taken over meanwhile
+        if response.status_code >= 500 or response.is_streamed:
+            _release(scope, key, claimed_at)
+        else:
+            _store(scope, key, claimed_at, response)
+        return response
+
+    return wrapper
+
+
+def purge_expired():
+    """
+    Delete keys past their expiry.
+
+    Returns:
+        int: Number of keys deleted
+    """
+    with db.engine.begin() as connection:
+        result = connection.execute(delete(_table).where(_table.c.expires_at < _now()))
+    return result.rowcount
+
+
+def _collect_loop():
+    while True:
+        time.sleep(IDEMPOTENCY_GC_INTERVAL_SECONDS)
+        try:
+            with _collector["app"].app_context():
+                purge_expired()
+        except Exception:
+            logger.exception("Failed to purge expired idempotency keys")
+
+
+def _ensure_collector():
+    if _collector["thread"] is not None:
+        return
+    with _lock:
+        if _collector["thread"] is None:
+            _collector["app"] = current_app._get_current_object()
+            thread = threading.Thread(target=_collect_loop, name="idempotency-key-gc", daemon=True)
+            _collector["thread"] = thread
+            thread.start()
@@ -0,0 +1,212 @@
+"""
+RFC 6902 JSON Patch for partial updates (PATCH /blogs/<id>, PATCH /courses/<id>).
+
+Lessons are addressed by index like any JSON array, e.g.
+[{"op": "replace", "path": "/content/3/body", "value": "..."}].
+
+A canonical content hash of the editable fields is compared before and after
+the patch, so a patch that changes nothing is detected without a write.
+"""
+
+import copy
+import hashlib
+import json
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or refers to a missing location."""
+
+
+class JsonPatchConflict(JsonPatchError):
+    """Raised when a `test` operation fails."""
+
+
+def content_hash(document):
+    """SHA-256 of the canonical JSON encoding of a document."""
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _pointer(path):
+    """Split a JSON Pointer (RFC 6901) into unescaped reference tokens."""
+    if not isinstance(path, str):
+        raise JsonPatchError("path must be a string")
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {path!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path[1:].split("/")]
+
+
+def _index(container, token, path, allow_end=False):
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index {token!r} in {path!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"Array index out of range in {path!r}")
+    return index
+
+
+def _walk(document, tokens, path):
+    """The container holding the last token of `tokens`."""
+    node = document
+    for token in tokens[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path not found: {path!r}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token, path)]
+        else:
+            raise JsonPatchError(f"Path not found: {path!r}")
+    return node
+
+
+def _get(document, path):
+    tokens = _pointer(path)
+    if not tokens:
+        return document
+    parent, token = _walk(document, tokens, path), tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: {path!r}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_index(parent, token, path)]
+    raise JsonPatchError(f"Path not found: {path!r}")
+
+
+def _add(document, path, value):
+    tokens = _pointer(path)
+    if not tokens:
+        return value
+    parent, token = _walk(document, tokens, path), tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, path, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Path not found: {path!r}")
+    return document
+
+
+def _remove(document, path):
+    tokens = _pointer(path)
+    if not tokens:
+        raise JsonPatchError("The whole document cannot be removed")
+    parent, token = _walk(document, tokens, path), tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: {path!r}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token, path))
+    raise JsonPatchError(f"Path not found: {path!r}")
+
+
+def _equal(left, right):
+    """JSON equality: unlike Python, true is not equal to 1."""
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(_equal(left[k], right[k]) for k in left)
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(_equal(a, b) for a, b in zip(left, right))
+    return left == right
+
+
+def _require(operation, member):
+    if member not in operation:
+        raise JsonPatchError(f"'{operation.get('op')}' operation requires '{member}'")
+    return operation[member]
+
+
+def apply_patch(document, operations):
+    """
+    Apply a JSON Patch to a copy of `document`.
+
+    Args:
+        document: JSON-compatible value
+        operations: List of RFC 6902 operation objects
+
+    Returns:
+        The patched copy
+
+    Raises:
+        JsonPatchError: If the patch is malformed or a location is missing
+        JsonPatchConflict: If a `test` operation fails
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+
+    document = copy.deepcopy(document)
+    for position, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise JsonPatchError(f"Operation {position} must be an object")
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise JsonPatchError(f"Operation {position}: op must be one of: {', '.join(OPERATIONS)}")
+        path = _require(operation, "path")
+
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(_require(operation, "value")))
+        elif op == "remove":
+            _remove(document, path)
+        elif op == "replace":
+            value = copy.deepcopy(_require(operation, "value"))
+            _get(document, path)
+            if path == "":
+                document = value
+            else:
+                _remove(document, path)
+                document = _add(document, path, value)
+        elif op == "move":
+            source = _require(operation, "from")
+            if path != source and path.startswith(source + "/"):
+                raise JsonPatchError(f"Cannot move {source!r} into one of its children")
+            value = _remove(document, source)
+            document = _add(document, path, value)
+        elif op == "copy":
+            value = copy.deepcopy(_get(document, _require(operation, "from")))
+            document = _add(document, path, value)
+        elif op == "test":
+            if not _equal(_get(document, path), _require(operation, "value")):
+                raise JsonPatchConflict(f"Test failed for {path!r}")
+    return document
+
+
+def patch_fields(current, operations):
+    """
+    Apply a patch to a resource's editable fields.
+
+    Args:
+        current: Dict of the resource's editable fields
+        operations: JSON Patch operations
+
+    Returns:
+        tuple: (patched: dict, changed: list[str]); `changed` is empty when
+            the content hash did not move
+
+    Raises:
+        JsonPatchError: If the patch is invalid or touches unknown fields
+    """
+    patched = apply_patch(current, operations)
+    if not isinstance(patched, dict):
+        raise JsonPatchError("The patched document must be an object")
+    unknown = set(patched).difference(current)
+    if unknown:
+        raise JsonPatchError(f"Unknown or read-only field(s): {', '.join(sorted(unknown))}")
+
+    if content_hash(patched) == content_hash(current):
+        return patched, []
+    changed = [
+        field
+        for field in current
+        if field not in patched or not _equal(patched[field], current[field])
+    ]
+    return patched, changed
@@ -0,0 +1,100 @@
+"""
+Lesson-level reads from Course.content.
+
+Lessons are extracted with JSON path expressions in SQL so that reading one
+lesson (or a short range) does not transfer and parse the whole course.
+"""
+
+from sqlalchemy import func, text
+from app.database import db
+from app.models import Course
+
+_TITLES_SQL = {
+    "postgresql": text(
+        "SELECT e.ordinality - 1 AS idx, e.value ->> 'title' AS title "
+        "FROM course, json_array_elements(course.content) WITH ORDINALITY AS e(value, ordinality) "
+        "WHERE course.id = :course_id ORDER BY e.ordinality"
+    ),
+    "sqlite": text(
+        "SELECT CAST(j.key AS INTEGER) AS idx, json_extract(j.value, '$.title') AS title "
+        "FROM course, json_each(course.content) AS j "
+        "WHERE course.id = :course_id ORDER BY CAST(j.key AS INTEGER)"
+    ),
+}
+
+
+def lesson_count(course_id):
+    """
+    Number of lessons in a course.
+
+    Returns:
+        int|None: Lesson count, or None if the course does not exist
+    """
+    row = db.session.execute(
+        db.select(Course.id, func.coalesce(func.json_array_length(Course.content), 0))
+        .where(Course.id == course_id)
+    ).first()
+    return None if row is None else row[1]
+
+
+def lesson_titles(course_id):
+    """
+    Titles of every lesson in order, without reading the lesson bodies into Python.
+
+    Returns:
+        list[dict]: [{"index": int, "title": str|None}, ...]
+    """
+    statement = _TITLES_SQL.get(db.engine.dialect.name)
+    if statement is not None:
+        rows = db.session.execute(statement, {"course_id": course_id}).all()
+        return [{"index": idx, "title": title} for idx, title in rows]
+
+    # Dialects without JSON table functions fall back to loading the column
+    content = db.session.execute(
+        db.select(Course.content).where(Course.id == course_id)
+    ).scalar() or []
+    return [
+        {"index": idx, "title": lesson.get("title") if isinstance(lesson, dict) else None}
+        for idx, lesson in enumerate(content)
+    ]
+
+
+def lesson_range(course_id, start, stop):
+    """
+    Lessons [start, stop) extracted element-by-element in a single SELECT.
+
+    Args:
+        course_id: Course primary key
+        start: First lesson index (inclusive)
+        stop: Last lesson index (exclusive); callers bound stop - start
+
+    Returns:
+        list[dict]: Lessons that exist in the range, each with its "index"
+    """
+    if stop <= start:
+        return []
+
+    row = db.session.execute(
+        db.select(*(Course.content[idx] for idx in range(start, stop)))
+        .where(Course.id == course_id)
+    ).first()
+    if row is None:
+        return []
+
+    lessons = []
+    for idx, lesson in zip(range(start, stop), row):
+        if lesson is None:
+            break
+        lessons.append({"index": idx, **lesson} if isinstance(lesson, dict) else {"index": idx, "value": lesson})
+    return lessons
+
+
+def get_lesson(course_id, index):
+    """
+    A single lesson by index.
+
+    Returns:
+        dict|None: The lesson, or None if the course or index does not exist
+    """
+    lessons = lesson_range(course_id, index, index + 1)
+    return lessons[0] if lessons else None
@@ -0,0 +1,289 @@
+"""
+Render-once markdown for blog content, lesson fields and course PDFs.
+
+HTML is keyed by the SHA-256 of the markdown source and kept in two layers:
+- a per-worker LRU, in front of
+- the `rendered_markdown` table, shared by all workers and kept across restarts.
+
+Editing a source changes its hash, so a rendering is computed once per distinct
+text and never served stale. Changed courses and blogs are pre-rendered by the
+change signals so the first reader does not pay for it.
+"""
+
+import hashlib
+import logging
+import threading
+import markdown
+from flask import has_app_context
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.cache import TTLCache
+from app.constants import MARKDOWN_CACHE_MAX_ENTRIES, MARKDOWN_CACHE_TTL_SECONDS
+from app.database import db
+from app.models import Blog, Course, RenderedMarkdown
+from app.signals import blog_changed, course_changed
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "codehilite", "tables", "nl2br", "sane_lists"]
+
+# Lesson keys holding markdown; each gets a "<key>_html" sibling when rendered
+LESSON_MARKDOWN_FIELDS = ("body", "instructions", "expected_output", "conclusion")
+
+RENDER_MODES = ("html",)
+
+_rendered = TTLCache(maxsize=MARKDOWN_CACHE_MAX_ENTRIES, ttl=MARKDOWN_CACHE_TTL_SECONDS)
+_local = threading.local()
+
+
+class InvalidRender(ValueError):
+    """Raised when the `render` query parameter has an unsupported value."""
+
+
+def parse_render(args):
+    """
+    Read the `render` query parameter.
+
+    Returns:
+        bool: True when HTML renderings were requested (render=html)
+
+    Raises:
+        InvalidRender: If `render` is given with any other value
+    """
+    mode = args.get("render")
+    if not mode:
+        return False
+    if mode.lower() not in RENDER_MODES:
+        raise InvalidRender(f"render must be one of: {', '.join(RENDER_MODES)}")
+    return True
+
+
+def as_source(value):
+    """Markdown source for a stored value; lists are joined line by line."""
+    if not value:
+        return ""
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return value if isinstance(value, str) else str(value)
+
+
+def content_hash(source):
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _convert(source):
+    # Building a Markdown instance loads every extension (and Pygments for
+    # codehilite), so each thread keeps one and resets it between documents
+    renderer = getattr(_local, "renderer", None)
+    if renderer is None:
+        renderer = _local.renderer = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    try:
+        return renderer.convert(source)
+    finally:
+        renderer.reset()
+
+
+def _load(hashes):
+    rows = db.session.execute(
+        select(RenderedMarkdown.content_hash, RenderedMarkdown.html)
+        .where(RenderedMarkdown.content_hash.in_(hashes))
+    ).all()
+    return dict(rows)
+
+
+def _store(renderings):
+    """Persist new renderings in their own transaction, leaving the session alone."""
+    rows = [{"content_hash": key, "html": html} for key, html in renderings.items()]
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(RenderedMarkdown), rows)
+    except IntegrityError:
+        # Another worker stored some of them first; insert the rest one by one
+        for row in rows:
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(RenderedMarkdown), row)
+            except IntegrityError:
+                pass
+
+
+def render_many(values):
+    """
+    Render several markdown values, reusing any earlier rendering.
+
+    Args:
+        values: Iterable of markdown sources (strings, lists or None)
+
+    Returns:
+        dict: source -> HTML, for every distinct non-empty source
+    """
+    by_hash = {}
+    for value in values:
+        source = as_source(value)
+        if source:
+            by_hash.setdefault(content_hash(source), source)
+    if not by_hash:
+        return {}
+
+    html_by_hash = {}
+    for key in by_hash:
+        html = _rendered.get(key)
+        if html is not None:
+            html_by_hash[key] = html
+
+    missing = [key for key in by_hash if key not in html_by_hash]
+    persistent = has_app_context()
+    if missing and persistent:
+        html_by_hash.update(_load(missing))
+        missing = [key for key in missing if key not in html_by_hash]
+
+    fresh = {key: _convert(by_hash[key]) for key in missing}
+    if fresh and persistent:
+        try:
+            _store(fresh)
+        except Exception:
+            # Still served from the rendering just made; the next miss retries
+            logger.exception("Failed to store %d markdown renderings", len(fresh))
+    html_by_hash.update(fresh)
+
+    for key, html in html_by_hash.items():
+        _rendered.set(key, html)
+    return {by_hash[key]: html for key, html in html_by_hash.items()}
+
+
+def render_markdown(value):
+    """HTML for a single markdown value ("" for empty values)."""
+    source = as_source(value)
+    return render_many([source]).get(source, "")
+
+
+def _lesson_sources(lessons):
+    for lesson in lessons or []:
+        if isinstance(lesson, dict):
+            for field in LESSON_MARKDOWN_FIELDS:
+                yield lesson.get(field)
+
+
+def _with_lesson_html(lesson, rendered):
+    if not isinstance(lesson, dict):
+        return lesson
+    extra = {
+        f"{field}_html": rendered.get(as_source(lesson.get(field)), "")
+        for field in LESSON_MARKDOWN_FIELDS
+        if field in lesson
+    }
+    return {**lesson, **extra}
+
+
+def render_lessons(lessons):
+    """Copies of the lessons with a "<field>_html" key next to each markdown field."""
+    rendered = render_many(_lesson_sources(lessons))
+    return [_with_lesson_html(lesson, rendered) for lesson in lessons or []]
+
+
+def render_course_dicts(courses):
+    """
+    Add rendered lessons to serialized courses that include `content`.
+
+    The lesson dicts are copied, never modified, since they may belong to
+    loaded model instances.
+    """
+    rendered = render_many(
+        source for course in courses for source in _lesson_sources(course.get("content"))
+    )
+    for course in courses:
+        if isinstance(course.get("content"), list):
+            course["content"] = [_with_lesson_html(lesson, rendered) for lesson in course["content"]]
+    return courses
+
+
+def render_blog_dicts(blogs):
+    """Add `content_html` to serialized blogs that include `content`."""
+    rendered = render_many(blog.get("content") for blog in blogs)
+    for blog in blogs:
+        if "content" in blog:
+            blog["content_html"] = rendered.get(as_source(blog["content"]), "")
+    return blogs
+
+
+def prerender_courses(course_ids):
+    contents = db.session.execute(
+        select(Course.content).where(Course.id.in_(course_ids))
+    ).scalars()
+    render_many(source for content in contents for source in _lesson_sources(content))
+
+
+def prerender_blogs(blog_ids):
+    render_many(
+        db.session.execute(select(Blog.content).where(Blog.id.in_(blog_ids))).scalars()
+    )
+
+
+def _referenced_hashes(batch_size=200):
+    def sources():
+        for content in db.session.execute(select(Course.content)).yield_per(batch_size).scalars():
+            yield from _lesson_sources(content)
+        yield from db.session.execute(select(Blog.content)).yield_per(batch_size).scalars()
+
+    return {content_hash(source) for source in map(as_source, sources()) if source}
+
+
+def warm_all(batch_size=200):
+    """
+    Render every blog and lesson that has no stored rendering yet.
+
+    Returns:
+        dict: Number of processed rows per kind
+    """
+    counts = {}
+    for kind, model, prerender in (
+        ("course", Course, prerender_courses),
+        ("blog", Blog, prerender_blogs),
+    ):
+        ids = [row[0] for row in db.session.execute(select(model.id).order_by(model.id))]
+        for start in range(0, len(ids), batch_size):
+            prerender(ids[start:start + batch_size])
+        counts[kind] = len(ids)
+    return counts
+
+
+def prune():
+    """
+    Delete stored renderings no course or blog refers to anymore.
+
+    Renderings produced for PDF-only fields (course goal, syllabus and
+    description) are pruned as well and re-rendered on the next download.
+
+    Returns:
+        int: Number of deleted rows
+    """
+    referenced = _referenced_hashes()
+    stored = db.session.execute(select(RenderedMarkdown.content_hash)).scalars().all()
+    unused = [key for key in stored if key not in referenced]
+    for start in range(0, len(unused), 500):
+        db.session.execute(
+            delete(RenderedMarkdown).where(RenderedMarkdown.content_hash.in_(unused[start:start + 500]))
+        )
+    db.session.commit()
+    _rendered.clear()
+    return len(unused)
+
+
+def _prerender(kind, ids, action, prerender):
+    if action == "deleted" or not ids:
+        return
+    try:
+        prerender(ids)
+    except Exception:
+        # Readers render on demand if this fails
+        logger.exception("Failed to pre-render markdown for %s %s", kind, ids)
+
+
+@course_changed.connect
+def _on_course_changed(sender, ids=(), action=None, **kwargs):
+    _prerender("course", list(ids), action, prerender_courses)
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, ids=(), action=None, **kwargs):
+    _prerender("blog", list(ids), action, prerender_blogs)
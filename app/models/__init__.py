@@ -1,8 +1,15 @@
 from app.models.user import User
+from app.models.user_list import OwnedCourse, FavouriteCourse, SavedBlog
 from app.models.course import Course
 from app.models.blog import Blog
 from app.models.contact import Contact
 from app.models.purchase import Purchase
+from app.models.cache_version import CacheVersion
+from app.models.tag import Tag, course_tag, blog_tag
+from app.models.rendered_markdown import RenderedMarkdown
+from app.models.related_items import RelatedItems
+from app.models.content_stats import ContentStats
+from app.models.idempotency_key import IdempotencyKey
 
-__all__ = ["User", "Course", "Blog", "Contact", "Purchase"]
+__all__ = ["User", "Course", "Blog", "Contact", "Purchase", "CacheVersion", "Tag", "course_tag", "blog_tag", "RenderedMarkdown", "RelatedItems", "ContentStats", "OwnedCourse", "FavouriteCourse", "SavedBlog", "IdempotencyKey"]
 
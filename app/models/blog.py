@@ -1,19 +1,23 @@
 from typing import Any
 from datetime import datetime
-from sqlalchemy import JSON, String, DateTime, Text, func 
+from sqlalchemy import JSON, String, DateTime, Text, func, Index
 from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from app.database import db
+from app.serialization import SerializerMixin, isoformat
 
 
-class Blog(db.Model):
+class Blog(db.Model, SerializerMixin):
     __tablename__ = "blog"
+    # Keyset pagination index for GET /blogs
+    __table_args__ = (Index("ix_blog_publication_date_id", "publication_date", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Keyset sort key of GET /blogs and the feeds, so never NULL
     publication_date: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
     author_name: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -28,22 +32,32 @@ class Blog(db.Model):
     image_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
     image_alt: Mapped[str | None] = mapped_column(String(255), nullable=True)
     image_header: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    serializers = {
+        "id": None,
+        "title": None,
+        "publication_date": isoformat,
+        "author_name": None,
+        "email": None,
+        "url": None,
+        "description": None,
+        "tags": None,
+        "content": None,
+        "image_url": None,
+        "image_alt": None,
+        "image_header": None,
+        "updated_at": isoformat,
+    }
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "publication_date": self.publication_date.isoformat() if self.publication_date else None,
-            "author_name": self.author_name,
-            "email": self.email,
-            "url": self.url,
-            "description": self.description,
-            "tags": self.tags,
-            "content": self.content,
-            "image_url": self.image_url,
-            "image_alt": self.image_alt,
-            "image_header": self.image_header,
-        }
+    SUMMARY_FIELDS = tuple(name for name in serializers if name != "content")
+    # Fields PUT and PATCH /blogs/<id> may change
+    EDITABLE_FIELDS = (
+        "title", "author_name", "email", "url", "description",
+        "tags", "content", "image_url", "image_alt",
+    )
 
     def __repr__(self):
         return f"<Blog {self.id}>"  
\ No newline at end of file
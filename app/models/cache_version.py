@@ -0,0 +1,58 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+class CacheVersion(db.Model):
+    """
+    Version stamp shared by all workers for one in-process cache namespace.
+
+    Writers bump the version; each worker compares it with the version its
+    local cache was built from and drops stale entries on mismatch.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    @classmethod
+    def current(cls, name):
+        """Stored version of a namespace (0 if it was never bumped)."""
+        version = db.session.execute(
+            db.select(cls.version).filter_by(name=name)
+        ).scalar()
+        return version or 0
+
+    @classmethod
+    def bump(cls, name):
+        """
+        Increment a namespace's version and commit.
+
+        Returns:
+            int|None: The version written by this call, or None if another
+            worker created the row concurrently (its bump is enough)
+        """
+        try:
+            result = db.session.execute(
+                update(cls).where(cls.name == name).values(version=cls.version + 1)
+            )
+            if result.rowcount == 0:
+                db.session.add(cls(name=name, version=1))
+                db.session.flush()
+            # Read back inside the same transaction: the row is locked by the
+            # UPDATE, so this is the value this call wrote
+            version = cls.current(name)
+            db.session.commit()
+            return version
+        except IntegrityError:
+            db.session.rollback()
+            return None
+
+    def __repr__(self):
+        return f"<CacheVersion {self.name}={self.version}>"
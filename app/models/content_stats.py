@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, String, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+class ContentStats(db.Model):
+    """
+    Aggregated counters of one course or blog.
+
+    Written only by app.content_stats, which buffers view increments in
+    memory and adds them here in batches.
+    """
+
+    __tablename__ = "content_stats"
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    views: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<ContentStats {self.kind} {self.item_id}>"
@@ -1,15 +1,21 @@
 from typing import Any
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import JSON, String, DateTime, Numeric, Text, func, UniqueConstraint
+from sqlalchemy import JSON, String, DateTime, Numeric, Text, func, UniqueConstraint, Index
 from sqlalchemy.ext.mutable import MutableList, MutableDict
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, undefer
 from app.database import db
+from app.serialization import SerializerMixin, isoformat, to_float
 
 
-class Course(db.Model):
+class Course(db.Model, SerializerMixin):
     __tablename__ = "course"
-    __table_args__ = (UniqueConstraint("name", name="course_name"),)
+    __table_args__ = (
+        UniqueConstraint("name", name="course_name"),
+        # Keyset pagination indexes for GET /courses and GET /courses/<topic>
+        Index("ix_course_created_at_id", "created_at", "id"),
+        Index("ix_course_topic_created_at_id", "topic", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -31,9 +37,12 @@ class Course(db.Model):
         MutableDict.as_mutable(JSON),
         nullable=True,
     )
+    # Lesson bodies are large and only needed on the course detail page, so
+    # the column is deferred; use Course.with_content() to load it eagerly.
     content: Mapped[list[dict[str, Any]] | None] = mapped_column(
-        MutableList.as_mutable(JSON), 
-        nullable=True, 
+        MutableList.as_mutable(JSON),
+        nullable=True,
+        deferred=True,
     )
     image_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
     image_alt: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -45,24 +54,39 @@ class Course(db.Model):
         DateTime(timezone=True), server_default=func.now()
     )
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "price": float(self.price),
-            "discount": float(self.discount),
-            "level": self.level,
-            "tags": self.tags,
-            "description": self.description,
-            "summary": self.summary,
-            "image_url": self.image_url,
-            "image_alt": self.image_alt,
-            "image_header": self.image_header,
-            "topic": self.topic,
-            "content": self.content,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
+    serializers = {
+        "id": None,
+        "name": None,
+        "price": to_float,
+        "discount": to_float,
+        "level": None,
+        "tags": None,
+        "description": None,
+        "summary": None,
+        "image_url": None,
+        "image_alt": None,
+        "image_header": None,
+        "topic": None,
+        "content": None,
+        "updated_at": isoformat,
+        "created_at": isoformat,
+    }
+
+    CARD_FIELDS = tuple(name for name in serializers if name != "content")
+    # Fields PUT and PATCH /courses/<id> may change
+    EDITABLE_FIELDS = (
+        "name", "price", "discount", "topic", "level", "description",
+        "tags", "summary", "content", "image_url", "image_alt",
+    )
+
+    @staticmethod
+    def with_content():
+        """Query option that loads the deferred `content` column in the same SELECT."""
+        return undefer(Course.content)
+
+    def to_card_dict(self):
+        """Serialize the course for list views, without touching `content`."""
+        return self.to_dict(Course.CARD_FIELDS)
 
     def __repr__(self):
         return f"<Course {self.name}>"
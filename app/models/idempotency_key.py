@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+class IdempotencyKey(db.Model):
+    """
+    Outcome of a request sent with an `Idempotency-Key` header.
+
+    Written only by app.idempotency. A row without a status code belongs to a
+    request that is still running; once it finishes, the response is stored
+    so that retries with the same key replay it until `expires_at`.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    # "user:<id>" for authenticated requests, "anonymous" otherwise
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of method, path and body: a key is bound to one request
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    mimetype: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Set in Python (UTC) rather than by the database, so they compare
+    # consistently with the times app.idempotency binds
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope} {self.key}>"
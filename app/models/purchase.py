@@ -3,10 +3,11 @@ from decimal import Decimal
 from sqlalchemy import String, DateTime, Numeric, ForeignKey, func, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import db
+from app.serialization import SerializerMixin, isoformat, to_float
 import secrets
 
 
-class Purchase(db.Model):
+class Purchase(db.Model, SerializerMixin):
     __tablename__ = "purchases"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -36,17 +37,16 @@ class Purchase(db.Model):
         """Generate a unique invoice number in format INV-XXXXXXXXXX"""
         return f"INV-{secrets.token_hex(5).upper()}"
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "course_id": self.course_id,
-            "price_paid": float(self.price_paid),
-            "discount_applied": float(self.discount_applied),
-            "final_price": float(self.final_price),
-            "invoice_number": self.invoice_number,
-            "purchase_date": self.purchase_date.isoformat() if self.purchase_date else None,
-        }
+    serializers = {
+        "id": None,
+        "user_id": None,
+        "course_id": None,
+        "price_paid": to_float,
+        "discount_applied": to_float,
+        "final_price": to_float,
+        "invoice_number": None,
+        "purchase_date": isoformat,
+    }
 
     def __repr__(self):
         return f"<Purchase {self.invoice_number}>"
@@ -0,0 +1,26 @@
+from typing import Any
+from datetime import datetime
+from sqlalchemy import JSON, String, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+class RelatedItems(db.Model):
+    """
+    Precomputed nearest neighbours of one course or blog, most similar first.
+
+    Written in bulk by app.related.rebuild(); `neighbors` holds
+    [[item_id, score], ...] for items of the same kind.
+    """
+
+    __tablename__ = "related_items"
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    neighbors: Mapped[list[list[Any]]] = mapped_column(JSON, nullable=False, default=list)
+    built_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<RelatedItems {self.kind} {self.item_id}>"
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+class RenderedMarkdown(db.Model):
+    """
+    HTML rendering of a markdown source, keyed by the SHA-256 of the source.
+
+    Rows are never updated: edited content hashes to a new key, so an entry
+    can only go unused (see `flask markdown prune`), never stale.
+    """
+
+    __tablename__ = "rendered_markdown"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    html: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<RenderedMarkdown {self.content_hash[:12]}>"
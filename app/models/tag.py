@@ -0,0 +1,44 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import db
+
+
+# Normalized copies of the {label, color} entries in Course.tags / Blog.tags.
+# The JSON columns remain the source of truth for serialization; these tables
+# exist so tag filters and counts are index lookups instead of table scans.
+course_tag = db.Table(
+    "course_tag",
+    Column("course_id", Integer, ForeignKey("course.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tag.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_course_tag_tag_id_course_id", "tag_id", "course_id"),
+)
+
+blog_tag = db.Table(
+    "blog_tag",
+    Column("blog_id", Integer, ForeignKey("blog.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tag.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_blog_tag_tag_id_blog_id", "tag_id", "blog_id"),
+)
+
+
+class Tag(db.Model):
+    __tablename__ = "tag"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Lower-cased label used for matching, so ?tags=react finds "React"
+    slug: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
+    label: Mapped[str] = mapped_column(String(100), nullable=False)
+    color: Mapped[str | None] = mapped_column(String(20), nullable=True)
+
+    @staticmethod
+    def slugify(label):
+        return label.strip().lower()
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "color": self.color,
+        }
+
+    def __repr__(self):
+        return f"<Tag {self.label}>"
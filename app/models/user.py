@@ -1,15 +1,37 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, func, UniqueConstraint, JSON
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy import String, DateTime, Index, Integer, func, UniqueConstraint
+from sqlalchemy.orm import Mapped, load_only, mapped_column, relationship, selectinload
 from app.database import db
+from app.models.user_list import FavouriteCourse, OwnedCourse, SavedBlog
+from app.serialization import SerializerMixin, isoformat, list_or_empty
 
 
-class User(db.Model):
+def _id_list(entries_attribute, model):
+    """
+    A list-of-ids view over one of the user's entry relationships.
+
+    Assigning a list replaces the entries, keeping its order (duplicates dropped).
+    """
+
+    def get_ids(self):
+        return [entry.item_id for entry in getattr(self, entries_attribute)]
+
+    def set_ids(self, item_ids):
+        setattr(self, entries_attribute, [
+            model(item_id=item_id, position=position)
+            for position, item_id in enumerate(dict.fromkeys(item_ids or []))
+        ])
+
+    return property(get_ids, set_ids)
+
+
+class User(db.Model, SerializerMixin):
     __tablename__ = "users"
     __table_args__ = (
         UniqueConstraint("username", name="username"),
         UniqueConstraint("email", name="user_email"),
+        # Keyset pagination index for GET /users
+        Index("ix_users_created_at_id", "created_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -18,17 +40,16 @@ class User(db.Model):
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[str] = mapped_column(String(20), nullable=False, default='user', server_default='user')
     profile_picture: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    owned_courses: Mapped[list[int]] = mapped_column(
-        MutableList.as_mutable(JSON),
-        default=list,
+    # Bumped by every change to the user or its lists (see app.user_cache)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    owned_course_entries: Mapped[list[OwnedCourse]] = relationship(
+        order_by=OwnedCourse.position, cascade="all, delete-orphan"
     )
-    favourite_courses: Mapped[list[int]] = mapped_column(
-        MutableList.as_mutable(JSON),
-        default=list,
+    favourite_course_entries: Mapped[list[FavouriteCourse]] = relationship(
+        order_by=FavouriteCourse.position, cascade="all, delete-orphan"
     )
-    saved_blogs: Mapped[list[int]] = mapped_column(
-        MutableList.as_mutable(JSON),
-        default=list,
+    saved_blog_entries: Mapped[list[SavedBlog]] = relationship(
+        order_by=SavedBlog.position, cascade="all, delete-orphan"
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -37,18 +58,45 @@ class User(db.Model):
         DateTime(timezone=True), server_default=func.now()
     )
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "role": self.role,
-            "profile_picture": self.profile_picture,
-            "created_at": self.created_at.isoformat(),
-            "owned_courses": self.owned_courses or [],
-            "favourite_courses": self.favourite_courses or [],
-            "saved_blogs": self.saved_blogs or [],
-        }
+    serializers = {
+        "id": None,
+        "username": None,
+        "email": None,
+        "role": None,
+        "profile_picture": None,
+        "created_at": isoformat,
+        "owned_courses": list_or_empty,
+        "favourite_courses": list_or_empty,
+        "saved_blogs": list_or_empty,
+    }
+
+    owned_courses = _id_list("owned_course_entries", OwnedCourse)
+    favourite_courses = _id_list("favourite_course_entries", FavouriteCourse)
+    saved_blogs = _id_list("saved_blog_entries", SavedBlog)
+
+    # Serialized list field -> relationship holding its entries
+    LIST_FIELDS = {
+        "owned_courses": "owned_course_entries",
+        "favourite_courses": "favourite_course_entries",
+        "saved_blogs": "saved_blog_entries",
+    }
+    SCALAR_FIELDS = ("id", "username", "email", "role", "profile_picture", "created_at")
+
+    @classmethod
+    def with_lists(cls, fields=None):
+        """
+        Query options that load the id lists among `fields` (all by default)
+        with one extra SELECT per list for the whole result, instead of one
+        per user.
+        """
+        names = [name for name in fields or cls.LIST_FIELDS if name in cls.LIST_FIELDS]
+        return tuple(selectinload(getattr(cls, cls.LIST_FIELDS[name])) for name in names)
+
+    @classmethod
+    def load_only_fields(cls, fields, *extra_columns):
+        """Like SerializerMixin.load_only_fields; list fields are loaded by with_lists()."""
+        columns = [getattr(cls, name) for name in fields if name not in cls.LIST_FIELDS]
+        return load_only(cls.id, *columns, *extra_columns)
 
     def __repr__(self):
         return f"<User {self.username}>"
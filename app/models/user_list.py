@@ -0,0 +1,73 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column, synonym
+from app.database import db
+
+
+# One row per entry of a user's owned courses, favourite courses and saved
+# blogs. The composite primary key makes membership checks index lookups, the
+# (item, user) index answers "who has item X", and `position` keeps the order
+# in which entries were added, which is the order responses list them in.
+
+
+class OwnedCourse(db.Model):
+    __tablename__ = "user_owned_course"
+    __table_args__ = (Index("ix_user_owned_course_course_id_user_id", "course_id", "user_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    course_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("course.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    item_id = synonym("course_id")
+
+    def __repr__(self):
+        return f"<OwnedCourse {self.user_id} {self.course_id}>"
+
+
+class FavouriteCourse(db.Model):
+    __tablename__ = "user_favourite_course"
+    __table_args__ = (Index("ix_user_favourite_course_course_id_user_id", "course_id", "user_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    course_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("course.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    item_id = synonym("course_id")
+
+    def __repr__(self):
+        return f"<FavouriteCourse {self.user_id} {self.course_id}>"
+
+
+class SavedBlog(db.Model):
+    __tablename__ = "user_saved_blog"
+    __table_args__ = (Index("ix_user_saved_blog_blog_id_user_id", "blog_id", "user_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    blog_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("blog.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    item_id = synonym("blog_id")
+
+    def __repr__(self):
+        return f"<SavedBlog {self.user_id} {self.blog_id}>"
@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are ordered by a sort column plus the primary key as a tie-breaker and
+the cursor is an opaque, URL-safe encoding of the last row's key. Fetching the
+next page is a single indexed range scan no matter how deep the client is.
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import String, and_, literal, or_
+from app.database import db
+from app.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor or limit query parameter cannot be decoded."""
+
+
+def encode_cursor(*values):
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+
+    Args:
+        *values: Sort key values (datetimes, ints or strings)
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from the query string
+
+    Returns:
+        list: Sort key values
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload must be a list")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse the `limit` query parameter.
+
+    Returns:
+        int: Page size clamped to [1, maximum]
+
+    Raises:
+        InvalidCursor: If the value is not an integer
+    """
+    if raw_limit is None or raw_limit == "":
+        return default
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise InvalidCursor("limit must be an integer")
+    return max(1, min(limit, maximum))
+
+
+def bind_value(value):
+    """
+    Bind a cursor or filter value for comparison against a column.
+
+    SQLite stores `CURRENT_TIMESTAMP` defaults as 'YYYY-MM-DD HH:MM:SS' while
+    SQLAlchemy binds datetimes with microseconds, so equal timestamps would not
+    compare equal. Bind those values in the stored text format instead.
+    """
+    if isinstance(value, datetime) and db.engine.dialect.name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return literal(value.replace(tzinfo=None).strftime(fmt), type_=String)
+    return value
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=True):
+    """
+    Fetch one page of `query` ordered by (sort_column, id_column).
+
+    Args:
+        query: SQLAlchemy query to paginate (without ORDER BY)
+        sort_column: Primary sort column, e.g. Course.created_at
+        id_column: Unique tie-breaker column, usually the primary key
+        cursor: Cursor returned with the previous page, or None for the first page
+        limit: Page size
+        descending: Sort newest first
+
+    Returns:
+        tuple: (items: list, next_cursor: str|None)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise InvalidCursor("Invalid cursor")
+        sort_value, id_value = bind_value(values[0]), values[1]
+        if descending:
+            query = query.filter(
+                or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < id_value),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > sort_value,
+                    and_(sort_column == sort_value, id_column > id_value),
+                )
+            )
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+
+    return items, next_cursor
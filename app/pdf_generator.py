@@ -4,7 +4,7 @@ PDF generation utility for courses with markdown support
 from io import BytesIO
 from weasyprint import HTML, CSS
 from datetime import datetime
-import markdown
+from app.markdown_cache import LESSON_MARKDOWN_FIELDS, render_many, render_markdown
 import html
 import re
 import os
@@ -46,36 +46,16 @@ def markdown_to_html(text):
     """
     Convert markdown text to HTML with code block support
 
+    Renderings are shared with the API's ?render=html output through the
+    render-once cache, so unchanged text is not converted again.
+
     Args:
-        text: Markdown formatted text (must be a string)
+        text: Markdown formatted text (lists are joined with newlines)
 
     Returns:
         HTML string
     """
-    if not text:
-        return ''
-
-    # Ensure text is a string
-    if isinstance(text, list):
-        # If it's a list, join items with newlines
-        text = '\n'.join(str(item) for item in text)
-    elif not isinstance(text, str):
-        # Convert to string if it's not already
-        text = str(text)
-
-    # Configure markdown with extensions
-    md = markdown.Markdown(extensions=[
-        'fenced_code',
-        'codehilite',
-        'tables',
-        'nl2br',
-        'sane_lists'
-    ])
-
-    # Convert markdown to HTML
-    html_output = md.convert(text)
-
-    return html_output
+    return render_markdown(text)
 
 
 def escape_html(text):
@@ -93,6 +73,19 @@ def escape_html(text):
     return html.escape(str(text))
 
 
+def _markdown_sources(description, summary, content):
+    yield description
+    if summary:
+        yield summary.get('goal')
+        syllabus = summary.get('syllabus')
+        if isinstance(syllabus, list):
+            yield from syllabus
+    for lesson in content or []:
+        if isinstance(lesson, dict):
+            for field in LESSON_MARKDOWN_FIELDS:
+                yield lesson.get(field)
+
+
 def create_course_html(course):
     """
     Create HTML content for the course PDF
@@ -112,6 +105,10 @@ def create_course_html(course):
     summary = course.get('summary', {})
     content = course.get('content', [])
 
+    # Render every markdown field in one batch so that cache misses cost a
+    # single lookup instead of one per field
+    render_many(_markdown_sources(description, summary, content))
+
     # Construct course URL
     # Get frontend URL from environment variable, default to localhost
     frontend_url = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')[0]
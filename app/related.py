@@ -0,0 +1,275 @@
+"""
+Related courses and blogs.
+
+The similarity of two items of the same kind mixes:
+- cosine similarity of TF-IDF vectors over title and description, and
+- cosine similarity of their tag sets (tag overlap normalized by set sizes),
+weighted by RELATED_TAG_WEIGHT.
+
+Both signals are sparse matrices. Item-by-item similarities are computed one
+block of rows at a time and only each item's RELATED_TOP_K best neighbours
+are kept, in the `related_items` table. Rebuilds run in a background thread
+shortly after courses or blogs change, or on demand with
+`flask related rebuild`. Workers keep the neighbour lists in memory, so
+answering a request is a dictionary lookup.
+"""
+
+import logging
+import re
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from app.constants import (
+    RELATED_BLOCK_SIZE,
+    RELATED_MAX_FEATURES,
+    RELATED_REBUILD_DELAY_SECONDS,
+    RELATED_TAG_WEIGHT,
+    RELATED_TOP_K,
+    RELATED_VERSION_CHECK_SECONDS,
+)
+from app.database import db
+from app.models import Blog, CacheVersion, Course, RelatedItems, Tag
+from app.signals import blog_changed, course_changed
+
+logger = logging.getLogger(__name__)
+
+RELATED_NAMESPACE = "related"
+
+# kind -> (model, title column)
+SOURCES = {
+    "course": (Course, Course.name),
+    "blog": (Blog, Blog.title),
+}
+
+_TOKEN = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+_STOP_WORDS = frozenset(
+    "the and for with you your are this that from into how what when our all can will not "
+    "has have its about also more using use de la el en los las del con para por una que "
+    "como sus tu es".split()
+)
+
+_lock = threading.Lock()
+_state = {"neighbors": None, "version": None, "checked_at": float("-inf")}
+
+_schedule_lock = threading.Lock()
+_pending = {}
+
+
+def _tokens(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+def _documents(kind):
+    """Ids, weighted text and tag slugs of every item of a kind, in id order."""
+    model, title_column = SOURCES[kind]
+    rows = db.session.execute(
+        select(model.id, title_column, model.description, model.tags).order_by(model.id)
+    ).all()
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    # The title is counted twice so it weighs more than the description
+    texts = [_tokens(f"{title} {title} {description or ''}") for _, title, description, _ in rows]
+    tags = [
+        sorted({
+            Tag.slugify(tag["label"])
+            for tag in row_tags or []
+            if isinstance(tag, dict) and isinstance(tag.get("label"), str) and tag["label"].strip()
+        })
+        for _, _, _, row_tags in rows
+    ]
+    return ids, texts, tags
+
+
+def _count_matrix(token_lists, max_features=None):
+    """Sparse document-term count matrix, keeping the most frequent terms."""
+    vocabulary = {}
+    rows, columns = [], []
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            columns.append(vocabulary.setdefault(token, len(vocabulary)))
+            rows.append(row)
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.float32), (rows, columns)),
+        shape=(len(token_lists), len(vocabulary)),
+    )
+    counts.sum_duplicates()
+    if max_features and counts.shape[1] > max_features:
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+        keep = np.sort(np.argsort(-document_frequency, kind="stable")[:max_features])
+        counts = counts[:, keep]
+    return counts
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+def _tfidf(counts):
+    """Sublinear TF times smoothed IDF, L2-normalized per document."""
+    documents = counts.shape[0]
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + documents) / (1 + document_frequency)) + 1.0
+    weighted = counts.copy()
+    weighted.data = 1.0 + np.log(weighted.data)
+    return _normalize_rows(weighted @ sparse.diags(idf.astype(np.float32)))
+
+
+def _top_neighbors(text, tags, top_k, tag_weight=RELATED_TAG_WEIGHT, block_size=RELATED_BLOCK_SIZE):
+    """
+    Yield (first_row, indices, scores) per block of rows, where indices and
+    scores hold each row's best `top_k` other rows, most similar first.
+    """
+    total = text.shape[0]
+    top_k = min(top_k, total - 1)
+    text_t = text.T.tocsr()
+    tags_t = tags.T.tocsr()
+
+    for start in range(0, total, block_size):
+        stop = min(start + block_size, total)
+        scores = (1.0 - tag_weight) * (text[start:stop] @ text_t).toarray()
+        scores += tag_weight * (tags[start:stop] @ tags_t).toarray()
+        # An item is not related to itself
+        scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        yield (
+            start,
+            np.take_along_axis(best, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
+
+
+def compute_neighbors(kind, top_k=RELATED_TOP_K):
+    """
+    Nearest neighbours of every item of a kind.
+
+    Returns:
+        dict: item id -> [[neighbor id, score], ...], most similar first;
+            neighbours without any shared term or tag are left out
+    """
+    ids, texts, tags = _documents(kind)
+    if len(ids) < 2:
+        return {int(item_id): [] for item_id in ids}
+
+    text = _tfidf(_count_matrix(texts, RELATED_MAX_FEATURES))
+    tag_sets = _normalize_rows(_count_matrix(tags))
+
+    neighbors = {}
+    for start, best, scores in _top_neighbors(text, tag_sets, top_k):
+        for offset, (row_best, row_scores) in enumerate(zip(best, scores)):
+            keep = row_scores > 0
+            neighbors[int(ids[start + offset])] = [
+                [int(item_id), round(float(score), 4)]
+                for item_id, score in zip(ids[row_best[keep]], row_scores[keep])
+            ]
+    return neighbors
+
+
+def rebuild(kind, top_k=RELATED_TOP_K):
+    """
+    Recompute and store the neighbour lists of one kind.
+
+    Returns:
+        int: Number of stored lists
+    """
+    neighbors = compute_neighbors(kind, top_k)
+    db.session.execute(delete(RelatedItems).where(RelatedItems.kind == kind))
+    if neighbors:
+        db.session.execute(
+            insert(RelatedItems),
+            [
+                {"kind": kind, "item_id": item_id, "neighbors": items}
+                for item_id, items in neighbors.items()
+            ],
+        )
+    db.session.commit()
+    CacheVersion.bump(RELATED_NAMESPACE)
+
+    with _lock:
+        _state["checked_at"] = float("-inf")
+    return len(neighbors)
+
+
+def rebuild_all():
+    return {kind: rebuild(kind) for kind in SOURCES}
+
+
+def _ensure_loaded():
+    now = time.monotonic()
+    if _state["neighbors"] is not None and now - _state["checked_at"] < RELATED_VERSION_CHECK_SECONDS:
+        return
+
+    version = CacheVersion.current(RELATED_NAMESPACE)
+    with _lock:
+        if _state["neighbors"] is None or version != _state["version"]:
+            rows = db.session.execute(
+                select(RelatedItems.kind, RelatedItems.item_id, RelatedItems.neighbors)
+            ).all()
+            _state["neighbors"] = {(kind, item_id): items for kind, item_id, items in rows}
+            _state["version"] = version
+        _state["checked_at"] = now
+
+
+def related_items(kind, item_id, limit=RELATED_TOP_K):
+    """
+    Stored neighbours of an item.
+
+    Returns:
+        list|None: [(neighbor id, score), ...] most similar first, or None if
+            nothing was computed for the item yet
+    """
+    _ensure_loaded()
+    items = _state["neighbors"].get((kind, item_id))
+    if items is None:
+        return None
+    return [(neighbor_id, score) for neighbor_id, score in items[:limit]]
+
+
+def _run_scheduled(app, kind):
+    with _schedule_lock:
+        # Changes arriving from now on schedule another rebuild
+        if _pending.get(kind, (None,))[0] is threading.current_thread():
+            del _pending[kind]
+    with app.app_context():
+        try:
+            rebuild(kind)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to rebuild related %s lists", kind)
+
+
+def schedule_rebuild(app, kind, delay=RELATED_REBUILD_DELAY_SECONDS):
+    """
+    Rebuild one kind in a background thread after `delay` seconds.
+
+    Changes arriving while a rebuild is pending share it, unless they ask
+    for an earlier one.
+    """
+    due = time.monotonic() + delay
+    with _schedule_lock:
+        pending = _pending.get(kind)
+        if pending is not None:
+            if pending[1] <= due:
+                return
+            pending[0].cancel()
+        timer = threading.Timer(delay, _run_scheduled, args=(app, kind))
+        timer.daemon = True
+        _pending[kind] = (timer, due)
+        timer.start()
+
+
+@course_changed.connect
+def _on_course_changed(sender, **kwargs):
+    schedule_rebuild(sender, "course")
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, **kwargs):
+    schedule_rebuild(sender, "blog")
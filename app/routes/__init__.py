@@ -7,6 +7,9 @@ from app.routes.blogs import blogs_bp
 from app.routes.contacts import contacts_bp
 from app.routes.upload import upload_bp
 from app.routes.purchases import purchases_bp
+from app.routes.search import search_bp
+from app.routes.tags import tags_bp
+from app.routes.admin import admin_bp
 
 
 def register_blueprints(app):
@@ -19,3 +22,6 @@ def register_blueprints(app):
     app.register_blueprint(contacts_bp)
     app.register_blueprint(upload_bp)
     app.register_blueprint(purchases_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(tags_bp)
+    app.register_blueprint(admin_bp)
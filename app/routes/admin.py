@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify, request
+from app.auth_middleware import admin_required
+from app.bulk_import import IMPORT_KINDS, import_ndjson
+from app.constants import IMPORT_BATCH_SIZE, IMPORT_MAX_BATCH_SIZE, IMPORT_MAX_CONTENT_LENGTH
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.route("/admin/import/<kind>", methods=["POST"])
+@admin_required
+def bulk_import(current_user_id, kind):
+    """
+    Import blogs or courses from a newline-delimited JSON body (one object per
+    line, same fields as POST /blogs or POST /courses). Admin only.
+
+    Query params:
+    - batch_size: Rows inserted per statement and commit (default 1000, max 10000)
+
+    Returns:
+    {
+        "kind": "blogs",
+        "imported": 9998,
+        "failed": 2,
+        "errors": [{"line": 17, "error": "Email is required"}, ...],
+        "errors_truncated": false
+    }
+    """
+    if kind not in IMPORT_KINDS:
+        return jsonify({"error": f"Invalid kind. Valid kinds: {', '.join(IMPORT_KINDS)}"}), 400
+
+    try:
+        batch_size = int(request.args.get("batch_size", IMPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    batch_size = max(1, min(batch_size, IMPORT_MAX_BATCH_SIZE))
+
+    # Imports are far larger than the default upload limit
+    request.max_content_length = IMPORT_MAX_CONTENT_LENGTH
+
+    report = import_ndjson(kind, request.stream, batch_size=batch_size)
+    return jsonify(report.to_dict()), 200
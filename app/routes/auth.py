@@ -3,6 +3,8 @@ from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
 import os
+from sqlalchemy.exc import IntegrityError
+from app import availability
 from app.database import db
 from app.models import User
 from app.validation import validate_email, validate_username, validate_password
@@ -45,11 +47,12 @@ def signup():
     if not is_valid:
         return jsonify({"error": error}), 400
 
-    # Check uniqueness
-    if User.query.filter_by(username=username).first():
+    # Check uniqueness (at most one query, only for names that may be taken)
+    taken = availability.taken(username, email)
+    if taken["username"]:
         return jsonify({"error": "Username already exists"}), 409
 
-    if User.query.filter_by(email=email).first():
+    if taken["email"]:
         return jsonify({"error": "Email already exists"}), 409
 
     # Hash the password
@@ -59,13 +62,16 @@ def signup():
         username=username,
         email=email,
         password_hash=hashed_password,
-        owned_courses=[],
-        favourite_courses=[],
-        saved_blogs=[],
     )
 
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent signup took the username or email first
+        db.session.rollback()
+        return jsonify({"error": "Username or email already exists"}), 409
+    availability.record(user)
 
     # Generate JWT token
     token = jwt.encode(
@@ -80,6 +86,40 @@ def signup():
     return jsonify({"token": token, "user": user.to_dict()}), 201
 
 
+@auth_bp.route("/auth/availability", methods=["GET"])
+def check_availability():
+    """
+    Whether a username and/or email can still be used to sign up.
+
+    Query params:
+    - username: Username to check
+    - email: Email to check
+
+    Each value given is answered as {"available": bool}, plus "error" when
+    the value would be rejected by signup anyway.
+    """
+    values = {
+        "username": request.args.get("username"),
+        "email": request.args.get("email"),
+    }
+    values = {kind: value for kind, value in values.items() if value}
+    if not values:
+        return jsonify({"error": "username or email is required"}), 400
+
+    validators = {"username": validate_username, "email": validate_email}
+    result = {}
+    for kind, value in list(values.items()):
+        is_valid, error = validators[kind](value)
+        if not is_valid:
+            result[kind] = {"available": False, "error": error}
+            del values[kind]
+
+    if values:
+        taken = availability.taken(**values)
+        result.update({kind: {"available": not taken[kind]} for kind in values})
+    return jsonify(result), 200
+
+
 @auth_bp.route("/login", methods=["POST"])
 def login():
     data = request.get_json()
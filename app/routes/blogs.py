@@ -1,62 +1,207 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, abort, current_app, jsonify, request
 from sqlalchemy.exc import IntegrityError
 from app.database import db
+from app.idempotency import idempotent
 from app.models import Blog
-from app.validation import validate_email, validate_string_field
+from app.validation import validate_blog_data, validate_email, validate_string_field, validate_tags
 from app.constants import MAX_BLOG_TITLE_LENGTH, MAX_BLOG_DESCRIPTION_LENGTH, MAX_BLOG_CONTENT_LENGTH
+from app.serialization import InvalidFields, requested_fields
+from app.signals import blog_changed
+from app.http_cache import compute_etag, conditional_response
+from app.catalog_cache import catalog_version, request_cache_key
+from app.streaming import iter_json_envelope, stream_query, streaming_json_response
+from app.pagination import InvalidCursor, keyset_paginate, parse_limit
+from app.tags import InvalidTagFilter, filter_by_tags, parse_tag_filter, remove_tags, sync_tags
+from app.markdown_cache import InvalidRender, parse_render, render_blog_dicts
+from app.blog_feed import FEED_MIMETYPES, get_feed
+from app.related import related_items, schedule_rebuild
+from app.constants import RELATED_DEFAULT_LIMIT, RELATED_TOP_K
+from app.content_stats import InvalidInclude, item_stats, parse_include, record_view
+from app.json_patch import JsonPatchConflict, JsonPatchError, patch_fields
+from app import user_lists
 
 blogs_bp = Blueprint("blogs", __name__)
 
 
 @blogs_bp.route("/blogs", methods=["GET"])
 def get_blogs():
-    blogs = Blog.query.order_by(Blog.publication_date.desc()).all()
-    return jsonify([blog.to_dict() for blog in blogs])
+    """
+    List blogs newest first, one page at a time. Article bodies are left out
+    unless requested through `fields`.
+
+    Query params:
+    - limit: Page size (default 20, max 100)
+    - cursor: `next_cursor` from the previous page
+    - fields: Comma-separated fields to return (default: all but content)
+    - tags: Comma-separated tag labels to filter by (case-insensitive)
+    - match: "any" (default) or "all" of the given tags
+    - stream=true: Stream every matching blog in one response instead of a page
+    - render=html: Add `content_html` (rendered markdown) when content is returned
+
+    Returns:
+    {
+        "blogs": [...],
+        "count": 20,
+        "next_cursor": "..."  # null on the last page
+    }
+    """
+    try:
+        fields = requested_fields(Blog) or Blog.SUMMARY_FIELDS
+        base_query = filter_by_tags(Blog.query, "blog", parse_tag_filter(request.args))
+        limit = parse_limit(request.args.get("limit"))
+        render = parse_render(request.args)
+    except (InvalidFields, InvalidTagFilter, InvalidCursor, InvalidRender) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Every blog change bumps the catalog version: no query needed to validate
+    etag = compute_etag(request_cache_key(), catalog_version())
+
+    query = base_query.options(Blog.load_only_fields(fields, Blog.publication_date))
+
+    def serialize(blogs):
+        items = [blog.to_dict(fields) for blog in blogs]
+        return render_blog_dicts(items) if render else items
+
+    def build_stream():
+        ordered = query.order_by(Blog.publication_date.desc(), Blog.id.desc())
+        return streaming_json_response(
+            iter_json_envelope(
+                "blogs", stream_query(ordered), lambda blog: serialize([blog])[0], next_cursor=None
+            )
+        )
 
+    def build_page():
+        blogs, next_cursor = keyset_paginate(
+            query,
+            Blog.publication_date,
+            Blog.id,
+            cursor=request.args.get("cursor"),
+            limit=limit,
+        )
+        return jsonify(
+            {
+                "blogs": serialize(blogs),
+                "count": len(blogs),
+                "next_cursor": next_cursor,
+            }
+        )
 
-@blogs_bp.route("/blogs/<int:blog_id>", methods=["GET"])
-def get_blog(blog_id):
-    blog = Blog.query.get_or_404(blog_id)
-    return jsonify(blog.to_dict()), 200
+    try:
+        if request.args.get("stream", "false").lower() == "true":
+            return conditional_response(etag, None, build_stream)
+        return conditional_response(etag, None, build_page)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def _feed_response(kind):
+    document = get_feed(kind)
+    return conditional_response(
+        document.etag,
+        document.last_modified,
+        lambda: current_app.response_class(document.body, mimetype=FEED_MIMETYPES[kind]),
+    )
 
 
-@blogs_bp.route("/blogs", methods=["POST"])
-def create_blog():
-    data = request.get_json()
+@blogs_bp.route("/blogs/feed.xml", methods=["GET"])
+def get_blog_feed_atom():
+    """Atom feed of the newest blogs"""
+    return _feed_response("atom")
 
-    # Validate title
-    is_valid, error = validate_string_field(
-        data.get("title"), "Title", MAX_BLOG_TITLE_LENGTH
-    )
-    if not is_valid:
-        return jsonify({"error": error}), 400
 
-    # Validate author_name
-    is_valid, error = validate_string_field(data.get("author_name"), "Author name", 100)
-    if not is_valid:
-        return jsonify({"error": error}), 400
+@blogs_bp.route("/blogs/feed.json", methods=["GET"])
+def get_blog_feed_json():
+    """JSON Feed (version 1.1) of the newest blogs"""
+    return _feed_response("json")
 
-    # Validate email
-    is_valid, error = validate_email(data.get("email"))
-    if not is_valid:
-        return jsonify({"error": error}), 400
 
-    # Validate url
-    is_valid, error = validate_string_field(data.get("url"), "URL", 255)
-    if not is_valid:
-        return jsonify({"error": error}), 400
+@blogs_bp.route("/blogs/<int:blog_id>", methods=["GET"])
+def get_blog(blog_id):
+    """
+    Single blog.
+
+    Query params:
+    - fields: Comma-separated fields to return (default: all)
+    - render=html: Add `content_html` (rendered markdown) when content is returned
+    - include=stats: Add `stats` ({"views": n}); a 304 keeps the client's counts
+      until the blog itself changes
+    """
+    try:
+        fields = requested_fields(Blog)
+        render = parse_render(request.args)
+        include = parse_include(request.args)
+    except (InvalidFields, InvalidRender, InvalidInclude) as e:
+        return jsonify({"error": str(e)}), 400
+
+    updated_at = db.session.execute(
+        db.select(Blog.updated_at).filter_by(id=blog_id)
+    ).scalar()
+    if updated_at is None:
+        abort(404)
+
+    def build():
+        # Only full responses count as views: 304 revalidations are not
+        record_view("blog", blog_id)
+        query = Blog.query
+        if fields:
+            query = query.options(Blog.load_only_fields(fields))
+        blog = query.get_or_404(blog_id)
+        payload = blog.to_dict(fields)
+        if render:
+            render_blog_dicts([payload])
+        if "stats" in include:
+            payload["stats"] = item_stats("blog", blog_id)
+        return jsonify(payload), 200
+
+    # The live view count stays out of the ETag, or no request would ever
+    # revalidate; clients get fresh counts whenever the blog changes
+    etag = compute_etag(request_cache_key(), blog_id, updated_at)
+    return conditional_response(etag, updated_at, build)
+
+
+@blogs_bp.route("/blogs/<int:blog_id>/related", methods=["GET"])
+def get_related_blogs(blog_id):
+    """
+    Blogs most similar to this one (shared tags, similar title and description),
+    from the precomputed neighbour lists.
+
+    Query params:
+    - limit: Number of blogs (default 5, max 10)
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"), RELATED_DEFAULT_LIMIT, RELATED_TOP_K)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    neighbors = related_items("blog", blog_id, limit)
+    if neighbors is None:
+        if db.session.execute(db.select(Blog.id).filter_by(id=blog_id)).scalar() is None:
+            return jsonify({"error": "Blog not found"}), 404
+        # Not computed yet (new blog or first run); answer empty meanwhile
+        schedule_rebuild(current_app._get_current_object(), "blog", delay=0)
+        neighbors = []
+
+    ids = [neighbor_id for neighbor_id, _ in neighbors]
+    blogs = {
+        blog.id: blog
+        for blog in Blog.query.options(Blog.load_only_fields(Blog.SUMMARY_FIELDS))
+        .filter(Blog.id.in_(ids))
+        .all()
+    } if ids else {}
+    related = [
+        {**blogs[neighbor_id].to_dict(Blog.SUMMARY_FIELDS), "score": score}
+        for neighbor_id, score in neighbors
+        if neighbor_id in blogs
+    ]
+    return jsonify({"blog_id": blog_id, "count": len(related), "blogs": related})
 
-    # Validate description
-    is_valid, error = validate_string_field(
-        data.get("description"), "Description", MAX_BLOG_DESCRIPTION_LENGTH
-    )
-    if not is_valid:
-        return jsonify({"error": error}), 400
 
-    # Validate content (NUEVO)
-    is_valid, error = validate_string_field(
-        data.get("content"), "Content", MAX_BLOG_CONTENT_LENGTH
-    )
+@blogs_bp.route("/blogs", methods=["POST"])
+@idempotent
+def create_blog():
+    data = request.get_json()
+
+    is_valid, error = validate_blog_data(data)
     if not is_valid:
         return jsonify({"error": error}), 400
 
@@ -73,7 +218,10 @@ def create_blog():
             image_alt=data.get("image_alt"),
         )
         db.session.add(new_blog)
+        db.session.flush()
+        sync_tags("blog", [new_blog.id])
         db.session.commit()
+        blog_changed.send(current_app._get_current_object(), ids=[new_blog.id], action="created")
         return jsonify(
             {"message": "Blog created successfully", "blog": new_blog.to_dict()}
         ), 201
@@ -140,6 +288,9 @@ def update_blog(blog_id):
             blog.content = data["content"]
 
         if "tags" in data:
+            is_valid, error = validate_tags(data["tags"])
+            if not is_valid:
+                return jsonify({"error": error}), 400
             blog.tags = data["tags"]
 
         if "image_url" in data:
@@ -148,7 +299,11 @@ def update_blog(blog_id):
         if "image_alt" in data:
             blog.image_alt = data["image_alt"]
 
+        if "tags" in data:
+            sync_tags("blog", [blog.id])
+
         db.session.commit()
+        blog_changed.send(current_app._get_current_object(), ids=[blog.id], action="updated")
 
         return jsonify(
             {"message": "Blog updated successfully", "blog": blog.to_dict()}
@@ -165,14 +320,69 @@ def update_blog(blog_id):
         ), 500
 
 
+@blogs_bp.route("/blogs/<int:blog_id>", methods=["PATCH"])
+def patch_blog(blog_id):
+    """
+    Partially update a blog with an RFC 6902 JSON Patch
+    (Content-Type: application/json-patch+json), e.g.
+    [{"op": "replace", "path": "/title", "value": "New title"}].
+
+    Only the fields the patch actually changes are validated and written. A
+    patch that leaves the blog as it was writes nothing, so updated_at, the
+    caches and the feeds are left alone.
+    """
+    operations = request.get_json(silent=True)
+    if operations is None:
+        return jsonify({"error": "Request body must be a JSON Patch array"}), 400
+
+    blog = Blog.query.get_or_404(blog_id)
+    try:
+        patched, changed = patch_fields(blog.to_dict(Blog.EDITABLE_FIELDS), operations)
+    except JsonPatchConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except JsonPatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not changed:
+        return jsonify({"message": "Blog unchanged", "changed": [], "blog": blog.to_dict()}), 200
+
+    is_valid, error = validate_blog_data(patched, fields=changed)
+    if not is_valid:
+        return jsonify({"error": error}), 400
+    if "tags" in changed and not isinstance(patched.get("tags"), list):
+        return jsonify({"error": "tags must be a list"}), 400
+
+    try:
+        for field in changed:
+            setattr(blog, field, patched.get(field))
+        if "tags" in changed:
+            sync_tags("blog", [blog.id])
+
+        db.session.commit()
+        blog_changed.send(current_app._get_current_object(), ids=[blog.id], action="updated")
+
+        return jsonify(
+            {"message": "Blog updated successfully", "changed": changed, "blog": blog.to_dict()}
+        ), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
+            {"error": f"An error occurred while updating the blog: {str(e)}"}
+        ), 500
+
+
 @blogs_bp.route("/blogs/<int:blog_id>", methods=["DELETE"])
 def delete_blog(blog_id):
     try:
         blog = Blog.query.get_or_404(blog_id)
         blog_title = blog.title
 
+        remove_tags("blog", [blog_id])
+        user_lists.remove_items("blog", [blog_id])
         db.session.delete(blog)
         db.session.commit()
+        blog_changed.send(current_app._get_current_object(), ids=[blog_id], action="deleted")
 
         return jsonify({"message": f"Blog '{blog_title}' deleted successfully"}), 200
 
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from app.database import db
+from app.idempotency import idempotent
 from app.models import Contact
 from app.validation import validate_email, validate_string_field
 from app.constants import MAX_CONTACT_MESSAGE_LENGTH
@@ -7,6 +8,7 @@ from app.constants import MAX_CONTACT_MESSAGE_LENGTH
 contacts_bp = Blueprint("contacts", __name__)
 
 @contacts_bp.route("/contacts", methods=["POST"])
+@idempotent
 def post_messages():
     data = request.get_json()
 
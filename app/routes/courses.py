@@ -1,33 +1,297 @@
-from flask import Blueprint, jsonify, request, send_file
+from decimal import Decimal, InvalidOperation
+from flask import Blueprint, abort, current_app, jsonify, request, send_file
 from sqlalchemy.exc import IntegrityError
-from app.models import Course, User
+from app.models import Course
 from app.database import db
+from app.idempotency import idempotent
 from app.auth_middleware import token_required
+from app.validation import validate_course_data, validate_tags
 from app.pdf_generator import generate_course_pdf
+from app.pagination import InvalidCursor, keyset_paginate, parse_limit
+from app.serialization import InvalidFields, requested_fields
+from app.catalog_cache import cached_json, catalog_version, request_cache_key
+from app.signals import course_changed
+from app.http_cache import compute_etag, conditional_response
+from app.lessons import get_lesson, lesson_count, lesson_range, lesson_titles
+from app.constants import MAX_LESSON_SLICE, RELATED_DEFAULT_LIMIT, RELATED_TOP_K
+from app.streaming import iter_json_envelope, stream_query, streaming_json_response
+from app.tags import InvalidTagFilter, filter_by_tags, parse_tag_filter, remove_tags, sync_tags
+from app.markdown_cache import InvalidRender, parse_render, render_course_dicts, render_lessons
+from app.related import related_items, schedule_rebuild
+from app.content_stats import InvalidInclude, item_stats, parse_include, record_view
+from app.json_patch import JsonPatchConflict, JsonPatchError, patch_fields
+from app import user_lists
+from app.user_cache import current_user
 
 courses_bp = Blueprint("courses", __name__)
 
 
+def _course_list_query(query, fields):
+    """Limit the SELECT to the requested fields plus the pagination key."""
+    if fields:
+        query = query.options(Course.load_only_fields(fields, Course.created_at))
+    return query
+
+
+def _serialize_course_list(courses, fields, render=False):
+    if not fields:
+        return [course.to_card_dict() for course in courses]
+    items = [course.to_dict(fields) for course in courses]
+    # Cards never include content, so only explicit field lists can need rendering
+    return render_course_dicts(items) if render else items
+
+
+def _collection_etag():
+    """
+    ETag of a (filtered) course collection.
+
+    Any course or blog change bumps the catalog version, so it validates
+    every listing without querying the collection itself.
+    """
+    return compute_etag(request_cache_key(), catalog_version())
+
+
+def _stream_courses(query, **extra):
+    """Stream every course matching `query` instead of one page."""
+    fields = requested_fields(Course)
+    render = parse_render(request.args)
+    query = _course_list_query(query, fields).order_by(Course.created_at.desc(), Course.id.desc())
+    serialize = lambda course: _serialize_course_list([course], fields, render)[0]
+    return streaming_json_response(
+        iter_json_envelope("courses", stream_query(query), serialize, next_cursor=None, **extra)
+    )
+
+
+def _wants_stream():
+    return request.args.get("stream", "false").lower() == "true"
+
+
+def _course_page_payload(query, **extra):
+    """Build one page of a course listing from the request's query params."""
+    fields = requested_fields(Course)
+    limit = parse_limit(request.args.get("limit"))
+    courses, next_cursor = keyset_paginate(
+        _course_list_query(query, fields),
+        Course.created_at,
+        Course.id,
+        cursor=request.args.get("cursor"),
+        limit=limit,
+    )
+    return {
+        **extra,
+        "count": len(courses),
+        "courses": _serialize_course_list(courses, fields, parse_render(request.args)),
+        "next_cursor": next_cursor,
+    }
+
+
 @courses_bp.route("/courses", methods=["GET"])
 def get_courses():
-    courses = Course.query.order_by(Course.created_at.desc()).all()
-    return jsonify(
-        {
-            "count": len(courses),
-            "courses": [course.to_dict() for course in courses],
-        }
-    )
+    """
+    List courses newest first, one page at a time.
+
+    Query params:
+    - limit: Page size (default 20, max 100)
+    - cursor: `next_cursor` from the previous page
+    - fields: Comma-separated fields to return (default: card fields)
+    - tags: Comma-separated tag labels to filter by (case-insensitive)
+    - match: "any" (default) or "all" of the given tags
+    - stream=true: Stream every matching course in one response instead of a page
+    - render=html: Add rendered lesson HTML when `content` is among the fields
+    """
+    try:
+        query = filter_by_tags(Course.query, "course", parse_tag_filter(request.args))
+        requested_fields(Course)
+        parse_render(request.args)
+        etag = _collection_etag()
+        if _wants_stream():
+            return conditional_response(etag, None, lambda: _stream_courses(query))
+        return conditional_response(
+            etag,
+            None,
+            lambda: cached_json(request_cache_key(), lambda: _course_page_payload(query)),
+        )
+    except (InvalidCursor, InvalidFields, InvalidTagFilter, InvalidRender) as e:
+        return jsonify({"error": str(e)}), 400
 
 @courses_bp.route("/courses/<int:course_id>", methods=["GET"])
 def get_course_by_id(course_id):
+    """
+    Single course, including its lessons.
+
+    Query params:
+    - fields: Comma-separated fields to return (default: all)
+    - render=html: Add a "<field>_html" rendering next to each lesson's
+      body, instructions, expected_output and conclusion
+    - include=stats: Add `stats` ({"views": n}); such responses bypass the
+      catalog cache since the counts change on every view, and a 304 keeps
+      the client's counts until the course itself changes
+    """
+    def build():
+        fields = requested_fields(Course)
+        if fields:
+            query = Course.query.options(Course.load_only_fields(fields))
+        else:
+            query = Course.query.options(Course.with_content())
+        course = query.get_or_404(course_id)
+        payload = course.to_dict(fields)
+        if render:
+            render_course_dicts([payload])
+        return payload
+
+    updated_at = _course_updated_at(course_id)
+    if updated_at is None:
+        abort(404)
+
     try:
-        course = Course.query.get_or_404(course_id)
-        return jsonify(course.to_dict()), 200
+        render = parse_render(request.args)
+        include = parse_include(request.args)
+
+        def full_response():
+            # Only full responses count as views: 304 revalidations are not
+            record_view("course", course_id)
+            if "stats" in include:
+                return jsonify({**build(), "stats": item_stats("course", course_id)})
+            return cached_json(request_cache_key(), build)
+
+        # The live view count stays out of the ETag, or ?include=stats would
+        # never revalidate; clients get fresh counts whenever the course changes
+        etag = compute_etag(request_cache_key(), course_id, updated_at)
+        return conditional_response(etag, updated_at, full_response)
+
+    except (InvalidFields, InvalidRender, InvalidInclude) as e:
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
         return jsonify({"error": f"An error occurred while retrieving the course: {str(e)}"}), 500
 
 
+def _course_updated_at(course_id):
+    return db.session.execute(
+        db.select(Course.updated_at).filter_by(id=course_id)
+    ).scalar()
+
+
+@courses_bp.route("/courses/<int:course_id>/lessons", methods=["GET"])
+def get_course_lessons(course_id):
+    """
+    Lesson index of a course (titles only), or full lessons for a range.
+
+    Query params:
+    - from, to: Return full lessons with index in [from, to) instead of titles
+      (at most 20 per request)
+    - render=html: Add rendered HTML next to the markdown fields of full lessons
+    """
+    raw_start, raw_stop = request.args.get("from"), request.args.get("to")
+    sliced = raw_start is not None or raw_stop is not None
+    try:
+        render = parse_render(request.args)
+    except InvalidRender as e:
+        return jsonify({"error": str(e)}), 400
+
+    count = lesson_count(course_id)
+    if count is None:
+        return jsonify({"error": "Course not found"}), 404
+
+    if sliced:
+        try:
+            start = int(raw_start) if raw_start else 0
+            stop = int(raw_stop) if raw_stop else start + MAX_LESSON_SLICE
+        except ValueError:
+            return jsonify({"error": "from and to must be integers"}), 400
+        if start < 0 or stop < start:
+            return jsonify({"error": "from must be >= 0 and to must be >= from"}), 400
+        if stop - start > MAX_LESSON_SLICE:
+            return jsonify({"error": f"At most {MAX_LESSON_SLICE} lessons can be requested at once"}), 400
+        stop = min(stop, count)
+
+    def build():
+        if sliced:
+            lessons = lesson_range(course_id, start, stop)
+            return {
+                "course_id": course_id,
+                "count": count,
+                "from": start,
+                "to": max(start, stop),
+                "lessons": render_lessons(lessons) if render else lessons,
+            }
+        return {"course_id": course_id, "count": count, "lessons": lesson_titles(course_id)}
+
+    updated_at = _course_updated_at(course_id)
+    etag = compute_etag(request_cache_key(), course_id, updated_at)
+    return conditional_response(
+        etag, updated_at, lambda: cached_json(request_cache_key(), build)
+    )
+
+
+@courses_bp.route("/courses/<int:course_id>/lessons/<int:index>", methods=["GET"])
+def get_course_lesson(course_id, index):
+    """
+    Single lesson by zero-based index.
+
+    Query params:
+    - render=html: Add rendered HTML next to the lesson's markdown fields
+    """
+    try:
+        render = parse_render(request.args)
+    except InvalidRender as e:
+        return jsonify({"error": str(e)}), 400
+
+    updated_at = _course_updated_at(course_id)
+    if updated_at is None:
+        return jsonify({"error": "Course not found"}), 404
+
+    def build():
+        lesson = get_lesson(course_id, index)
+        if lesson is None:
+            abort(404)
+        if render:
+            lesson = render_lessons([lesson])[0]
+        return {"course_id": course_id, "index": index, "lesson": lesson}
+
+    etag = compute_etag(request_cache_key(), course_id, updated_at)
+    return conditional_response(
+        etag, updated_at, lambda: cached_json(request_cache_key(), build)
+    )
+
+
+@courses_bp.route("/courses/<int:course_id>/related", methods=["GET"])
+def get_related_courses(course_id):
+    """
+    Courses most similar to this one (shared tags, similar name and description),
+    from the precomputed neighbour lists.
+
+    Query params:
+    - limit: Number of courses (default 5, max 10)
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"), RELATED_DEFAULT_LIMIT, RELATED_TOP_K)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    neighbors = related_items("course", course_id, limit)
+    if neighbors is None:
+        if _course_updated_at(course_id) is None:
+            return jsonify({"error": "Course not found"}), 404
+        # Not computed yet (new course or first run); answer empty meanwhile
+        schedule_rebuild(current_app._get_current_object(), "course", delay=0)
+        neighbors = []
+
+    ids = [neighbor_id for neighbor_id, _ in neighbors]
+    courses = {
+        course.id: course
+        for course in Course.query.options(Course.load_only_fields(Course.CARD_FIELDS))
+        .filter(Course.id.in_(ids))
+        .all()
+    } if ids else {}
+    related = [
+        {**courses[neighbor_id].to_card_dict(), "score": score}
+        for neighbor_id, score in neighbors
+        if neighbor_id in courses
+    ]
+    return jsonify({"course_id": course_id, "count": len(related), "courses": related})
+
+
 @courses_bp.route("/courses/<int:course_id>/download-pdf", methods=["GET"])
 @token_required
 def download_course_pdf(current_user_id, course_id):
@@ -42,16 +306,15 @@ def download_course_pdf(current_user_id, course_id):
             theme = 'light'
 
         # Get the course
-        course = Course.query.get_or_404(course_id)
+        course = Course.query.options(Course.with_content()).get_or_404(course_id)
 
         # Get the current user
-        user = User.query.get(current_user_id)
+        user = current_user()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
         # Check if user owns the course
-        owned_courses = user.owned_courses or []
-        if course_id not in owned_courses:
+        if not user_lists.contains("owned_courses", user.id, course_id):
             return jsonify({"error": "You must own this course to download it as PDF"}), 403
 
         # Generate PDF with theme
@@ -73,17 +336,16 @@ def download_course_pdf(current_user_id, course_id):
 
 
 @courses_bp.route("/courses", methods=["POST"])
+@idempotent
 def create_course():
     data = request.get_json()
 
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    # Validate required fields
-    required_fields = ["name", "price", "discount", "topic", "level", "description"]
-    for field in required_fields:
-        if field not in data or data[field] is None:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
+    is_valid, error = validate_course_data(data)
+    if not is_valid:
+        return jsonify({"error": error}), 400
 
     try:
         # Create new course
@@ -101,7 +363,10 @@ def create_course():
         )
 
         db.session.add(course)
+        db.session.flush()
+        sync_tags("course", [course.id])
         db.session.commit()
+        course_changed.send(current_app._get_current_object(), ids=[course.id], action="created")
 
         return jsonify({"message": "Course created successfully", "course": course.to_dict()}), 201
 
@@ -128,6 +393,11 @@ def update_course(course_id):
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
+    if "tags" in data:
+        is_valid, error = validate_tags(data["tags"])
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
     try:
         course = Course.query.get_or_404(course_id)
 
@@ -155,7 +425,11 @@ def update_course(course_id):
         if "image_alt" in data:
             course.image_alt = data["image_alt"]
 
+        if "tags" in data:
+            sync_tags("course", [course.id])
+
         db.session.commit()
+        course_changed.send(current_app._get_current_object(), ids=[course.id], action="updated")
 
         return jsonify({"message": "Course updated successfully", "course": course.to_dict()}), 200
 
@@ -175,14 +449,104 @@ def update_course(course_id):
         return jsonify({"error": f"An error occurred while updating the course: {str(e)}"}), 500
 
 
+def _patched_course_values(patched, changed):
+    """
+    Model values of the fields a patch changed.
+
+    Raises:
+        ValueError: If a changed field has the wrong type
+    """
+    values = {}
+    for field in changed:
+        value = patched.get(field)
+        if field in ("price", "discount"):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{field} must be a number")
+            value = Decimal(str(value))
+        elif field == "tags" and not isinstance(value, list):
+            raise ValueError("tags must be a list")
+        elif field == "content" and value is not None and not isinstance(value, list):
+            raise ValueError("content must be a list of lessons")
+        elif field == "summary" and value is not None and not isinstance(value, dict):
+            raise ValueError("summary must be an object")
+        values[field] = value
+    return values
+
+
+@courses_bp.route("/courses/<int:course_id>", methods=["PATCH"])
+def patch_course(course_id):
+    """
+    Partially update a course with an RFC 6902 JSON Patch
+    (Content-Type: application/json-patch+json).
+
+    Lessons are addressed by index, so one lesson can be edited without
+    resending the others, e.g.
+    [{"op": "replace", "path": "/content/2/body", "value": "..."}] or
+    [{"op": "add", "path": "/content/-", "value": {"title": "...", "body": "..."}}].
+
+    Only the fields the patch actually changes are validated and written. A
+    patch that leaves the course as it was writes nothing, so updated_at and
+    the caches are left alone.
+    """
+    operations = request.get_json(silent=True)
+    if operations is None:
+        return jsonify({"error": "Request body must be a JSON Patch array"}), 400
+
+    course = Course.query.options(Course.with_content()).filter_by(id=course_id).first_or_404()
+    try:
+        patched, changed = patch_fields(course.to_dict(Course.EDITABLE_FIELDS), operations)
+    except JsonPatchConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except JsonPatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not changed:
+        return jsonify({"message": "Course unchanged", "changed": [], "course": course.to_dict()}), 200
+
+    is_valid, error = validate_course_data(patched, fields=changed)
+    if not is_valid:
+        return jsonify({"error": error}), 400
+    try:
+        values = _patched_course_values(patched, changed)
+    except (InvalidOperation, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        for field, value in values.items():
+            setattr(course, field, value)
+        if "tags" in changed:
+            sync_tags("course", [course.id])
+
+        db.session.commit()
+        course_changed.send(current_app._get_current_object(), ids=[course.id], action="updated")
+
+        return jsonify(
+            {"message": "Course updated successfully", "changed": changed, "course": course.to_dict()}
+        ), 200
+
+    except IntegrityError as e:
+        db.session.rollback()
+        error_msg = str(e.orig)
+        if "course_name" in error_msg or "UNIQUE constraint" in error_msg:
+            return jsonify({"error": f"A course with the name '{values.get('name')}' already exists"}), 409
+        return jsonify({"error": f"Database integrity error: {error_msg}"}), 400
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"An error occurred while updating the course: {str(e)}"}), 500
+
+
 @courses_bp.route("/courses/<int:course_id>", methods=["DELETE"])
 def delete_course(course_id):
     try:
         course = Course.query.get_or_404(course_id)
         course_name = course.name
 
+        remove_tags("course", [course_id])
+        user_lists.remove_items("course", [course_id])
         db.session.delete(course)
         db.session.commit()
+        course_changed.send(current_app._get_current_object(), ids=[course_id], action="deleted")
 
         return jsonify({"message": f"Course '{course_name}' deleted successfully"}), 200
 
@@ -199,18 +563,32 @@ def get_courses_by_topic(topic):
     Valid topics: frontend, backend, database, git
 
     This route handles all topic-based filtering in one place,
-    eliminating code duplication.
+    eliminating code duplication. Results are paginated and can be
+    tag-filtered like GET /courses.
     """
     # Validate topic (optional: you could also just let the query return empty list)
     valid_topics = ["frontend", "backend", "database", "git"]
     if topic not in valid_topics:
         return jsonify({"error": f"Invalid topic. Valid topics: {', '.join(valid_topics)}"}), 400
 
-    courses = Course.query.filter_by(topic=topic).all()
-    return jsonify(
-        {
-            "topic": topic,
-            "count": len(courses),
-            "courses": [course.to_dict() for course in courses],
-        }
-    )
+    try:
+        query = filter_by_tags(
+            Course.query.filter_by(topic=topic), "course", parse_tag_filter(request.args)
+        )
+        requested_fields(Course)
+        parse_render(request.args)
+        etag = _collection_etag()
+        if _wants_stream():
+            return conditional_response(
+                etag, None, lambda: _stream_courses(query, topic=topic)
+            )
+        return conditional_response(
+            etag,
+            None,
+            lambda: cached_json(
+                request_cache_key(),
+                lambda: _course_page_payload(query, topic=topic),
+            ),
+        )
+    except (InvalidCursor, InvalidFields, InvalidTagFilter, InvalidRender) as e:
+        return jsonify({"error": str(e)}), 400
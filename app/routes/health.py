@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify
+from app.catalog_cache import cache_stats as catalog_cache_stats
 
 health_bp = Blueprint("health", __name__)
 
@@ -6,3 +7,9 @@ health_bp = Blueprint("health", __name__)
 @health_bp.route("/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "ok"})
+
+
+@health_bp.route("/health/cache", methods=["GET"])
+def cache_health():
+    """Per-worker cache counters"""
+    return jsonify({"catalog": catalog_cache_stats()})
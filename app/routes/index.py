@@ -1,6 +1,6 @@
-from flask import Blueprint, jsonify, make_response
-from app.models import Blog
-from app.models import Course
+from flask import Blueprint, current_app, jsonify, make_response
+from app.home_feed import get_home_snapshot
+from app.http_cache import conditional_response
 
 
 index_bp = Blueprint("index", __name__)
@@ -13,14 +13,12 @@ def welcome():
 
 @index_bp.route("/home", methods=["GET"])
 def get_home_data():
-    courses = Course.query.limit(4).all()
-    blogs = Blog.query.limit(4).all()
-
-    data = {
-        "courses": [course.to_dict() for course in courses],
-        "blogs": [blog.to_dict() for blog in blogs],
-    }
-    return jsonify(data)
+    snapshot = get_home_snapshot()
+    return conditional_response(
+        snapshot.etag,
+        None,
+        lambda: current_app.response_class(snapshot.body, mimetype="application/json"),
+    )
 
 
 @index_bp.route("/favicon.ico", methods=["GET"])
@@ -4,16 +4,23 @@ Purchase routes for course purchasing functionality
 
 from datetime import datetime
 from flask import Blueprint, request, jsonify
+from sqlalchemy import insert
 from sqlalchemy.orm import joinedload
 from app.database import db
 from app.models import User, Course, Purchase
+from app import user_lists
+from app.user_cache import cached_user, current_user
 from app.auth_middleware import token_required
+from app.idempotency import idempotent
+from app.serialization import InvalidFields, requested_fields
+from app.streaming import iter_json_envelope, stream_query, streaming_json_response
 
 purchases_bp = Blueprint('purchases', __name__)
 
 
 @purchases_bp.route('/purchase', methods=['POST'])
 @token_required
+@idempotent
 def purchase_courses(current_user_id):
     """
     Purchase one or more courses
@@ -23,6 +30,10 @@ def purchase_courses(current_user_id):
         "course_ids": [1, 2, 3]  # List of course IDs to purchase
     }
 
+    The cart is bought as a whole: if a course does not exist or is already
+    owned, nothing is bought and `errors` lists every offending course
+    (404 if courses are missing, 400 otherwise).
+
     Returns:
     {
         "message": "Purchase successful",
@@ -42,57 +53,71 @@ def purchase_courses(current_user_id):
         if not isinstance(course_ids, list) or len(course_ids) == 0:
             return jsonify({'error': 'course_ids must be a non-empty list'}), 400
 
+        if any(isinstance(course_id, bool) or not isinstance(course_id, int) for course_id in course_ids):
+            return jsonify({'error': 'course_ids must contain only integer ids'}), 400
+
+        # A course listed twice in the cart is bought once
+        course_ids = list(dict.fromkeys(course_ids))
+
         # Get the user
-        user = User.query.get(current_user_id)
+        user = current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        # Initialize owned_courses if None
-        if user.owned_courses is None:
-            user.owned_courses = []
+        # Concurrent checkouts of the same user wait here until this one
+        # commits, so ownership cannot change between the check and the insert
+        user_lists.lock_user(user.id)
 
-        purchases = []
-        invoice_numbers = []
+        # Every course and the ones the user already owns, one query each
+        courses = {
+            course.id: course
+            for course in Course.query.options(
+                Course.load_only_fields(('id', 'name', 'price', 'discount'))
+            ).filter(Course.id.in_(course_ids))
+        }
+        owned = user_lists.members('owned_courses', user.id, course_ids)
 
+        errors = []
         for course_id in course_ids:
-            # Check if course exists
-            course = Course.query.get(course_id)
-            if not course:
-                return jsonify({'error': f'Course with ID {course_id} not found'}), 404
-
-            # Check if user already owns this course
-            if course_id in user.owned_courses:
-                return jsonify({'error': f'You already own course: {course.name}'}), 400
-
+            if course_id not in courses:
+                errors.append({'course_id': course_id, 'error': f'Course with ID {course_id} not found'})
+            elif course_id in owned:
+                errors.append({
+                    'course_id': course_id,
+                    'error': f'You already own course: {courses[course_id].name}',
+                })
+        if errors:
+            db.session.rollback()
+            only_missing = all(error['course_id'] not in courses for error in errors)
+            return jsonify({
+                'error': errors[0]['error'] if len(errors) == 1 else 'Some courses cannot be purchased',
+                'errors': errors,
+            }), 404 if only_missing else 400
+
+        purchase_date = datetime.utcnow()
+        rows = []
+        for course_id in course_ids:
+            course = courses[course_id]
             # Calculate final price (price - discount)
             price_paid = float(course.price)
             discount_applied = float(course.discount) if course.discount else 0.0
-            final_price = max(0, price_paid - discount_applied)
-
-            # Generate invoice number
-            invoice_number = Purchase.generate_invoice_number()
-
-            # Create purchase record
-            purchase = Purchase(
-                user_id=current_user_id,
-                course_id=course_id,
-                price_paid=price_paid,
-                discount_applied=discount_applied,
-                final_price=final_price,
-                invoice_number=invoice_number,
-                purchase_date=datetime.utcnow()
-            )
-
-            db.session.add(purchase)
-            purchases.append(purchase.to_dict())
-            invoice_numbers.append(invoice_number)
-
-            # Add course to user's owned courses
-            user.owned_courses.append(course_id)
-
-        # Mark user.owned_courses as modified (needed for MutableList)
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(user, 'owned_courses')
+            rows.append({
+                'user_id': user.id,
+                'course_id': course_id,
+                'price_paid': price_paid,
+                'discount_applied': discount_applied,
+                'final_price': max(0, price_paid - discount_applied),
+                'invoice_number': Purchase.generate_invoice_number(),
+                'purchase_date': purchase_date,
+            })
+
+        # All purchase rows in one INSERT ... RETURNING, listed in cart order
+        inserted = db.session.scalars(insert(Purchase).returning(Purchase), rows).all()
+        by_course = {purchase.course_id: purchase.to_dict() for purchase in inserted}
+        purchases = [by_course[course_id] for course_id in course_ids]
+
+        # Add the courses to the user's owned courses
+        user_lists.add('owned_courses', user.id, course_ids)
 
         # Commit all changes
         db.session.commit()
@@ -100,8 +125,8 @@ def purchase_courses(current_user_id):
         return jsonify({
             'message': 'Purchase successful',
             'purchases': purchases,
-            'invoice_numbers': invoice_numbers,
-            'user': user.to_dict()
+            'invoice_numbers': [purchase['invoice_number'] for purchase in purchases],
+            'user': cached_user(current_user_id)
         }), 201
 
     except Exception as e:
@@ -117,6 +142,7 @@ def get_user_purchases(current_user_id):
 
     Query params:
     - expand=true: Include full course details in response
+    - fields: Comma-separated purchase fields to return
 
     Returns:
     {
@@ -126,30 +152,39 @@ def get_user_purchases(current_user_id):
     """
     try:
         expand = request.args.get('expand', 'false').lower() == 'true'
+        fields = requested_fields(Purchase)
 
         # Get all purchases for this user with eager loading to avoid N+1 queries
         query = Purchase.query.filter_by(user_id=current_user_id)
 
+        if fields:
+            # course_id is needed to attach the expanded course
+            query = query.options(Purchase.load_only_fields(fields, Purchase.course_id))
+
         if expand:
             # Use joinedload to fetch courses in a single query
-            query = query.options(joinedload(Purchase.course))
+            query = query.options(
+                joinedload(Purchase.course).options(Course.with_content())
+            )
 
-        purchases = query.all()
+        query = query.order_by(Purchase.id)
 
-        result = []
-        for purchase in purchases:
-            purchase_dict = purchase.to_dict()
+        def serialize(purchase):
+            purchase_dict = purchase.to_dict(fields)
 
             if expand and purchase.course:
                 # Course is already loaded from joinedload
                 purchase_dict['course'] = purchase.course.to_dict()
 
-            result.append(purchase_dict)
+            return purchase_dict
 
-        return jsonify({
-            'count': len(result),
-            'purchases': result
-        }), 200
+        # Rows are read in batches and encoded as they are streamed
+        return streaming_json_response(
+            iter_json_envelope('purchases', stream_query(query), serialize)
+        )
+
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -180,7 +215,7 @@ def get_invoice(invoice_number):
 
         # Get user and course details
         user = User.query.get(purchase.user_id)
-        course = Course.query.get(purchase.course_id)
+        course = Course.query.options(Course.with_content()).get(purchase.course_id)
 
         invoice_data = purchase.to_dict()
 
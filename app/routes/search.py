@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify, request
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor, parse_limit
+from app.search import KINDS, SearchUnavailable, search
+
+search_bp = Blueprint("search", __name__)
+
+
+@search_bp.route("/search", methods=["GET"])
+def search_content():
+    """
+    Ranked full-text search over courses and blogs.
+
+    Query params:
+    - q: Search text (required)
+    - type: "course" or "blog" to restrict results
+    - limit: Page size (default 20, max 100)
+    - cursor: `next_cursor` from the previous page
+
+    Snippets are HTML-escaped with matches wrapped in <mark> tags.
+    """
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+
+    kind = request.args.get("type")
+    if kind and kind not in KINDS:
+        return jsonify({"error": f"Invalid type. Valid types: {', '.join(KINDS)}"}), 400
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        offset = decode_cursor(cursor)[0] if cursor else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor("Invalid cursor")
+    except (InvalidCursor, IndexError):
+        return jsonify({"error": "Invalid cursor or limit"}), 400
+
+    try:
+        hits, has_more = search(query, kind=kind, limit=limit, offset=offset)
+    except SearchUnavailable as e:
+        return jsonify({"error": str(e)}), 501
+
+    return jsonify(
+        {
+            "query": query,
+            "count": len(hits),
+            "results": hits,
+            "next_cursor": encode_cursor(offset + limit) if has_more else None,
+        }
+    )
@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify, request
+from app.tags import TAGGED, tag_counts
+
+tags_bp = Blueprint("tags", __name__)
+
+
+@tags_bp.route("/tags", methods=["GET"])
+def get_tags():
+    """
+    Tags with the number of courses and blogs using each, most used first.
+
+    Query params:
+    - type: "course" or "blog" to only list tags used by that kind
+    """
+    kind = request.args.get("type")
+    if kind and kind not in TAGGED:
+        return jsonify({"error": f"Invalid type. Valid types: {', '.join(TAGGED)}"}), 400
+
+    tags = tag_counts(kind)
+    return jsonify({"count": len(tags), "tags": tags})
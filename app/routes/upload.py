@@ -4,8 +4,8 @@ import logging
 from flask import Blueprint, jsonify, request
 from werkzeug.utils import secure_filename
 from app.database import db
-from app.models import User
 from app.auth_middleware import token_required, verify_user_authorization
+from app.user_cache import bump_version, cached_user, load_user
 
 from app.constants import MAX_FILE_SIZE, ALLOWED_IMAGE_EXTENSIONS
 
@@ -33,7 +33,7 @@ def upload_profile_picture(current_user_id, user_id):
         return error
 
     # Check if user exists
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
 
     # Check if file is in request
     if "file" not in request.files:
@@ -91,6 +91,7 @@ def upload_profile_picture(current_user_id, user_id):
     # Update user profile picture URL
     profile_picture_url = f"/static/uploads/profile_pictures/{unique_filename}"
     user.profile_picture = profile_picture_url
+    bump_version(user.id)
     db.session.commit()
 
     return (
@@ -98,7 +99,7 @@ def upload_profile_picture(current_user_id, user_id):
             {
                 "message": "Profile picture uploaded successfully",
                 "profile_picture": profile_picture_url,
-                "user": user.to_dict(),
+                "user": cached_user(user_id),
             }
         ),
         200,
@@ -113,7 +114,7 @@ def delete_profile_picture(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
 
     if not user.profile_picture:
         return jsonify({"error": "No profile picture to delete"}), 404
@@ -128,11 +129,12 @@ def delete_profile_picture(current_user_id, user_id):
 
     # Update user
     user.profile_picture = None
+    bump_version(user.id)
     db.session.commit()
 
     return (
         jsonify(
-            {"message": "Profile picture deleted successfully", "user": user.to_dict()}
+            {"message": "Profile picture deleted successfully", "user": cached_user(user_id)}
         ),
         200,
     )
@@ -1,36 +1,108 @@
 from flask import Blueprint, jsonify, request
 from app.database import db
 from app.models import User
-from app.auth_middleware import token_required, verify_user_authorization
+from app import availability, user_lists
+from app.user_cache import cached_user, cached_user_or_404, forget, load_user
+from app.auth_middleware import admin_required, token_required, verify_user_authorization
+from app.pagination import InvalidCursor, keyset_paginate, parse_limit
+from app.serialization import InvalidFields, requested_fields
+from app.streaming import iter_csv, iter_ndjson, stream_query, streaming_response
+from app.user_directory import InvalidUserFilter, csv_cells, filter_users, parse_format
 
 
 users_bp = Blueprint("users", __name__)
 
 
-def get_courses_details(course_ids):
-    if not course_ids:
-        return []
+def _requested_item_id(data, key):
+    """
+    Read an item id from a JSON body.
 
-    from app.models import Course
+    Returns:
+        tuple: (item_id: int|None, error_response|None)
+    """
+    item_id = (data or {}).get(key)
+    if not item_id:
+        return None, (jsonify({"error": f"{key} is required"}), 400)
+    if isinstance(item_id, bool) or not isinstance(item_id, int):
+        return None, (jsonify({"error": f"{key} must be an integer"}), 400)
+    return item_id, None
 
-    courses = Course.query.filter(Course.id.in_(course_ids)).all()
-    return [course.to_dict() for course in courses]
 
+def _change_list(current_user_id, user_id, list_name, action_description):
+    """Apply a batch change (PUT body, see user_lists.parse_change) in one transaction."""
+    error = verify_user_authorization(current_user_id, user_id, action_description)
+    if error:
+        return error
 
-def get_blogs_details(blog_ids):
-    if not blog_ids:
-        return []
-
-    from app.models import Blog
+    user = load_user(user_id)
+    try:
+        replace, add, remove = user_lists.parse_change(request.get_json(silent=True))
+        change = user_lists.apply_change(list_name, user.id, replace, add, remove)
+    except user_lists.UnknownItems as e:
+        return jsonify({"error": str(e), "missing_ids": e.item_ids}), 404
+    except user_lists.InvalidListChange as e:
+        return jsonify({"error": str(e)}), 400
 
-    blogs = Blog.query.filter(Blog.id.in_(blog_ids)).all()
-    return [blog.to_dict() for blog in blogs]
+    db.session.commit()
+    return jsonify({
+        "user_id": user.id,
+        list_name: cached_user(user.id)[list_name],
+        **change,
+    }), 200
 
 
 @users_bp.route("/users", methods=["GET"])
-def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+@admin_required
+def get_users(current_user_id):
+    """
+    List users newest first, one page at a time (admin only).
+
+    Query params:
+    - limit: Page size (default 20, max 100)
+    - cursor: `next_cursor` from the previous page
+    - fields: Comma-separated fields to return (default: all)
+    - role, created_after, created_before, username (prefix): Filters
+    - format: "json" (default, one page), or "ndjson" / "csv" to stream every
+      matching user as an export
+    """
+    try:
+        fields = requested_fields(User)
+        export_format = parse_format(request.args)
+        query = filter_users(User.query, request.args).options(*User.with_lists(fields))
+        if fields:
+            # created_at is the pagination key
+            query = query.options(User.load_only_fields(fields, User.created_at))
+
+        if export_format != "json":
+            query = stream_query(query.order_by(User.created_at.desc(), User.id.desc()))
+            if export_format == "ndjson":
+                return streaming_response(
+                    iter_ndjson(query, lambda user: user.to_dict(fields)),
+                    "application/x-ndjson",
+                    filename="users.ndjson",
+                )
+            columns = list(fields or User.serializers)
+            return streaming_response(
+                iter_csv(query, columns, lambda user: csv_cells(user, columns)),
+                "text/csv",
+                filename="users.csv",
+            )
+
+        users, next_cursor = keyset_paginate(
+            query,
+            User.created_at,
+            User.id,
+            cursor=request.args.get("cursor"),
+            limit=parse_limit(request.args.get("limit")),
+        )
+    except (InvalidCursor, InvalidFields, InvalidUserFilter) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "count": len(users),
+        "users": [user.to_dict(fields) for user in users],
+        "next_cursor": next_cursor,
+    })
 
 
 @users_bp.route("/users", methods=["POST"])
@@ -51,21 +123,17 @@ def create_user():
     if "@" not in email:
         return jsonify({"error": "Invalid email format"}), 400
 
-    if User.query.filter_by(username=username).first():
+    taken = availability.taken(username, email)
+    if taken["username"]:
         return jsonify({"error": "Username already exists"}), 409
 
-    if User.query.filter_by(email=email).first():
+    if taken["email"]:
         return jsonify({"error": "Email already exists"}), 409
 
-    user = User(
-        username=username,
-        email=email,
-        owned_courses=[],
-        favourite_courses=[],
-        saved_blogs=[],
-    )
+    user = User(username=username, email=email)
     db.session.add(user)
     db.session.commit()
+    availability.record(user)
 
     return jsonify(user.to_dict()), 201
 
@@ -79,26 +147,25 @@ def get_user_profile(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    cached = cached_user_or_404(user_id)
 
-    user_data = user.to_dict()
-    user_data["owned_courses"] = get_courses_details(user.owned_courses or [])
-    user_data["favourite_courses"] = get_courses_details(user.favourite_courses or [])
-    user_data["saved_blogs"] = get_blogs_details(user.saved_blogs or [])
+    # Course and blog cards of all three lists come from a single query
+    user_data = {name: cached[name] for name in User.SCALAR_FIELDS}
+    user_data.update(user_lists.expanded(user_id))
 
     return jsonify(user_data)
 
 
 @users_bp.route("/users/<int:user_id>/owned-courses", methods=["GET"])
 def get_owned_courses(user_id):
-    user = User.query.get_or_404(user_id)
+    user_data = cached_user_or_404(user_id)
     expand = request.args.get("expand", "false").lower() == "true"
 
     if expand:
-        courses = get_courses_details(user.owned_courses or [])
-        return jsonify({"user_id": user.id, "owned_courses": courses}), 200
+        courses = user_lists.expanded(user_id, ["owned_courses"])["owned_courses"]
+        return jsonify({"user_id": user_id, "owned_courses": courses}), 200
 
-    return jsonify({"user_id": user.id, "owned_courses": user.owned_courses or []}), 200
+    return jsonify({"user_id": user_id, "owned_courses": user_data["owned_courses"]}), 200
 
 
 @users_bp.route("/users/<int:user_id>/owned-courses", methods=["POST"])
@@ -109,22 +176,18 @@ def add_owned_course(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
-    data = request.get_json()
-
-    course_id = data.get("course_id")
-    if not course_id:
-        return jsonify({"error": "course_id is required"}), 400
-
-    if user.owned_courses is None:
-        user.owned_courses = []
+    user = load_user(user_id)
+    course_id, error = _requested_item_id(request.get_json(), "course_id")
+    if error:
+        return error
 
-    if course_id not in user.owned_courses:
-        user.owned_courses.append(course_id)
-        db.session.commit()
-        return jsonify(user.to_dict()), 200
+    if user_lists.contains("owned_courses", user.id, course_id):
+        return jsonify({"message": "Course already owned"}), 200
 
-    return jsonify({"message": "Course already owned"}), 200
+    if not user_lists.add("owned_courses", user.id, [course_id]):
+        return jsonify({"error": "Course not found"}), 404
+    db.session.commit()
+    return jsonify(cached_user(user.id)), 200
 
 
 @users_bp.route(
@@ -137,28 +200,25 @@ def remove_owned_course(current_user_id, user_id, course_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
 
-    if user.owned_courses and course_id in user.owned_courses:
-        user.owned_courses.remove(course_id)
+    if user_lists.remove("owned_courses", user.id, course_id):
         db.session.commit()
-        return jsonify(user.to_dict()), 200
+        return jsonify(cached_user(user.id)), 200
 
     return jsonify({"error": "Course not found in owned courses"}), 404
 
 
 @users_bp.route("/users/<int:user_id>/favourite-courses", methods=["GET"])
 def get_favourite_courses(user_id):
-    user = User.query.get_or_404(user_id)
+    user_data = cached_user_or_404(user_id)
     expand = request.args.get("expand", "false").lower() == "true"
 
     if expand:
-        courses = get_courses_details(user.favourite_courses or [])
-        return jsonify({"user_id": user.id, "favourite_courses": courses}), 200
+        courses = user_lists.expanded(user_id, ["favourite_courses"])["favourite_courses"]
+        return jsonify({"user_id": user_id, "favourite_courses": courses}), 200
 
-    return jsonify(
-        {"user_id": user.id, "favourite_courses": user.favourite_courses or []}
-    ), 200
+    return jsonify({"user_id": user_id, "favourite_courses": user_data["favourite_courses"]}), 200
 
 
 @users_bp.route("/users/<int:user_id>/favourite-courses", methods=["POST"])
@@ -169,22 +229,31 @@ def add_favourite_course(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
-    data = request.get_json()
+    user = load_user(user_id)
+    course_id, error = _requested_item_id(request.get_json(), "course_id")
+    if error:
+        return error
+
+    if user_lists.contains("favourite_courses", user.id, course_id):
+        return jsonify({"message": "Course already in favourites"}), 200
 
-    course_id = data.get("course_id")
-    if not course_id:
-        return jsonify({"error": "course_id is required"}), 400
+    if not user_lists.add("favourite_courses", user.id, [course_id]):
+        return jsonify({"error": "Course not found"}), 404
+    db.session.commit()
+    return jsonify(cached_user(user.id)), 200
 
-    if user.favourite_courses is None:
-        user.favourite_courses = []
 
-    if course_id not in user.favourite_courses:
-        user.favourite_courses.append(course_id)
-        db.session.commit()
-        return jsonify(user.to_dict()), 200
+@users_bp.route("/users/<int:user_id>/favourite-courses", methods=["PUT"])
+@token_required
+def change_favourite_courses(current_user_id, user_id):
+    """
+    Add and remove several favourite courses at once, or replace the list.
 
-    return jsonify({"message": "Course already in favourites"}), 200
+    Body: {"add": [course ids], "remove": [course ids]} or {"replace": [course ids]}.
+    Either every change is applied or none: unknown course ids answer 404
+    with `missing_ids`.
+    """
+    return _change_list(current_user_id, user_id, "favourite_courses", "modify your own favourites")
 
 
 @users_bp.route(
@@ -197,26 +266,25 @@ def remove_favourite_course(current_user_id, user_id, course_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
 
-    if user.favourite_courses and course_id in user.favourite_courses:
-        user.favourite_courses.remove(course_id)
+    if user_lists.remove("favourite_courses", user.id, course_id):
         db.session.commit()
-        return jsonify(user.to_dict()), 200
+        return jsonify(cached_user(user.id)), 200
 
     return jsonify({"error": "Course not found in favourites"}), 404
 
 
 @users_bp.route("/users/<int:user_id>/saved-blogs", methods=["GET"])
 def get_saved_blogs(user_id):
-    user = User.query.get_or_404(user_id)
+    user_data = cached_user_or_404(user_id)
     expand = request.args.get("expand", "false").lower() == "true"
 
     if expand:
-        blogs = get_blogs_details(user.saved_blogs or [])
-        return jsonify({"user_id": user.id, "saved_blogs": blogs}), 200
+        blogs = user_lists.expanded(user_id, ["saved_blogs"])["saved_blogs"]
+        return jsonify({"user_id": user_id, "saved_blogs": blogs}), 200
 
-    return jsonify({"user_id": user.id, "saved_blogs": user.saved_blogs or []}), 200
+    return jsonify({"user_id": user_id, "saved_blogs": user_data["saved_blogs"]}), 200
 
 
 @users_bp.route("/users/<int:user_id>/saved-blogs", methods=["POST"])
@@ -227,22 +295,31 @@ def add_saved_blog(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
-    data = request.get_json()
+    user = load_user(user_id)
+    blog_id, error = _requested_item_id(request.get_json(), "blog_id")
+    if error:
+        return error
 
-    blog_id = data.get("blog_id")
-    if not blog_id:
-        return jsonify({"error": "blog_id is required"}), 400
+    if user_lists.contains("saved_blogs", user.id, blog_id):
+        return jsonify({"message": "Blog already saved"}), 200
 
-    if user.saved_blogs is None:
-        user.saved_blogs = []
+    if not user_lists.add("saved_blogs", user.id, [blog_id]):
+        return jsonify({"error": "Blog not found"}), 404
+    db.session.commit()
+    return jsonify(cached_user(user.id)), 200
 
-    if blog_id not in user.saved_blogs:
-        user.saved_blogs.append(blog_id)
-        db.session.commit()
-        return jsonify(user.to_dict()), 200
 
-    return jsonify({"message": "Blog already saved"}), 200
+@users_bp.route("/users/<int:user_id>/saved-blogs", methods=["PUT"])
+@token_required
+def change_saved_blogs(current_user_id, user_id):
+    """
+    Save and unsave several blogs at once, or replace the list.
+
+    Body: {"add": [blog ids], "remove": [blog ids]} or {"replace": [blog ids]}.
+    Either every change is applied or none: unknown blog ids answer 404
+    with `missing_ids`.
+    """
+    return _change_list(current_user_id, user_id, "saved_blogs", "modify your own saved blogs")
 
 
 @users_bp.route("/users/<int:user_id>/saved-blogs/<int:blog_id>", methods=["DELETE"])
@@ -253,31 +330,34 @@ def remove_saved_blog(current_user_id, user_id, blog_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
 
-    if user.saved_blogs and blog_id in user.saved_blogs:
-        user.saved_blogs.remove(blog_id)
+    if user_lists.remove("saved_blogs", user.id, blog_id):
         db.session.commit()
-        return jsonify(user.to_dict()), 200
+        return jsonify(cached_user(user.id)), 200
 
     return jsonify({"error": "Blog not found in saved blogs"}), 404
 
 
 @users_bp.route("/users/<int:user_id>", methods=["GET"])
 def get_user(user_id):
-    user = User.query.get_or_404(user_id)
     expand = request.args.get("expand", "false").lower() == "true"
+    try:
+        fields = None if expand else requested_fields(User)
+    except InvalidFields as e:
+        return jsonify({"error": str(e)}), 400
+
+    cached = cached_user_or_404(user_id)
+
+    if fields:
+        return jsonify({name: cached[name] for name in fields})
 
     if expand:
-        user_data = user.to_dict()
-        user_data["owned_courses"] = get_courses_details(user.owned_courses or [])
-        user_data["favourite_courses"] = get_courses_details(
-            user.favourite_courses or []
-        )
-        user_data["saved_blogs"] = get_blogs_details(user.saved_blogs or [])
+        user_data = {name: cached[name] for name in User.SCALAR_FIELDS}
+        user_data.update(user_lists.expanded(user_id))
         return jsonify(user_data)
 
-    return jsonify(user.to_dict())
+    return jsonify(cached)
 
 
 @users_bp.route("/users/<int:user_id>", methods=["DELETE"])
@@ -288,9 +368,10 @@ def delete_user(current_user_id, user_id):
     if error:
         return error
 
-    user = User.query.get_or_404(user_id)
+    user = load_user(user_id)
     if user_id != 1:
         db.session.delete(user)
         db.session.commit()
+        forget(user_id)
         return jsonify({"message": f"User {user.username} deleted successfully."}), 200
     return jsonify({"error": "Cannot delete user with ID 1"}), 403
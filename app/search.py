@@ -0,0 +1,239 @@
+"""
+Full-text search over courses and blogs.
+
+Documents live in the `search_index` table, which is an FTS5 virtual table on
+SQLite and a regular table with a generated, GIN-indexed `tsvector` column on
+PostgreSQL (see the migration that creates it). The index is kept current by
+the course/blog change signals and can be rebuilt with `flask search reindex`.
+"""
+
+import html
+import logging
+import re
+from sqlalchemy import text
+from app.database import db
+from app.models import Blog, Course
+from app.signals import blog_changed, course_changed
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "search_index"
+KINDS = ("course", "blog")
+
+# Control characters used as highlight markers so the snippet can be
+# HTML-escaped before the <mark> tags are inserted
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_SEARCH_SQL = {
+    "sqlite": (
+        "SELECT kind, ref_id, title, "
+        "snippet(search_index, 3, :mark_start, :mark_end, '…', 24) AS snippet, "
+        "bm25(search_index, 0.0, 0.0, 10.0, 1.0) AS rank "
+        "FROM search_index "
+        "WHERE search_index MATCH :query {kind_filter}"
+        "ORDER BY rank LIMIT :limit OFFSET :offset"
+    ),
+    "postgresql": (
+        "SELECT kind, ref_id, title, "
+        "ts_headline('english', body, q, "
+        "'StartSel=' || :mark_start || ', StopSel=' || :mark_end || ', MaxWords=40, MinWords=15') AS snippet, "
+        "ts_rank(document, q) AS rank "
+        "FROM search_index, websearch_to_tsquery('english', :query) AS q "
+        "WHERE document @@ q {kind_filter}"
+        "ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+    ),
+}
+
+
+class SearchUnavailable(RuntimeError):
+    """Raised when the database dialect has no full-text index support."""
+
+
+def _join(*parts):
+    return "\n".join(part for part in parts if part)
+
+
+def course_document(course):
+    """Searchable text of a course: name as title; description, tags and lessons as body."""
+    tags = " ".join(tag.get("label", "") for tag in course.tags or [] if isinstance(tag, dict))
+    lessons = [
+        _join(lesson.get("title"), lesson.get("body"))
+        for lesson in course.content or []
+        if isinstance(lesson, dict)
+    ]
+    return course.name, _join(course.description, tags, *lessons)
+
+
+def blog_document(blog):
+    """Searchable text of a blog: title as title; description, tags and content as body."""
+    tags = " ".join(tag.get("label", "") for tag in blog.tags or [] if isinstance(tag, dict))
+    return blog.title, _join(blog.description, tags, blog.content)
+
+
+def _delete(kind, ids):
+    if not ids:
+        return
+    statement = text(f"DELETE FROM {SEARCH_TABLE} WHERE kind = :kind AND ref_id = :ref_id")
+    db.session.execute(statement, [{"kind": kind, "ref_id": ref_id} for ref_id in ids])
+
+
+def _insert(kind, documents):
+    if not documents:
+        return
+    statement = text(
+        f"INSERT INTO {SEARCH_TABLE} (kind, ref_id, title, body) "
+        "VALUES (:kind, :ref_id, :title, :body)"
+    )
+    db.session.execute(
+        statement,
+        [
+            {"kind": kind, "ref_id": ref_id, "title": title, "body": body}
+            for ref_id, (title, body) in documents.items()
+        ],
+    )
+
+
+def index_courses(course_ids, replace=True):
+    """
+    (Re)index the given courses. Does not commit.
+
+    Pass replace=False for courses that cannot be indexed yet (just created):
+    on SQLite, deleting by ref_id has to scan the whole FTS5 table.
+    """
+    courses = (
+        Course.query.options(Course.with_content())
+        .filter(Course.id.in_(course_ids))
+        .all()
+    )
+    if replace:
+        _delete("course", course_ids)
+    _insert("course", {course.id: course_document(course) for course in courses})
+
+
+def index_blogs(blog_ids, replace=True):
+    """(Re)index the given blogs. Does not commit. See index_courses() for `replace`."""
+    blogs = Blog.query.filter(Blog.id.in_(blog_ids)).all()
+    if replace:
+        _delete("blog", blog_ids)
+    _insert("blog", {blog.id: blog_document(blog) for blog in blogs})
+
+
+def remove_documents(kind, ids):
+    """Remove documents from the index. Does not commit."""
+    _delete(kind, ids)
+
+
+def reindex_all(batch_size=200):
+    """
+    Rebuild the whole index.
+
+    Returns:
+        dict: Number of indexed documents per kind
+    """
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    counts = {}
+    for kind, model, index in (("course", Course, index_courses), ("blog", Blog, index_blogs)):
+        ids = [row[0] for row in db.session.execute(db.select(model.id).order_by(model.id))]
+        for start in range(0, len(ids), batch_size):
+            index(ids[start:start + batch_size], replace=False)
+        counts[kind] = len(ids)
+    db.session.commit()
+    return counts
+
+
+def _fts5_query(query):
+    """
+    Turn free text into a safe FTS5 query: every word is quoted (so FTS5
+    operators in user input are taken literally) and the last word matches
+    as a prefix, which keeps search-as-you-type useful.
+    """
+    terms = re.findall(r"\w+", query, flags=re.UNICODE)
+    if not terms:
+        return None
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _highlight(snippet):
+    if not snippet:
+        return ""
+    escaped = html.escape(snippet)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search(query, kind=None, limit=20, offset=0):
+    """
+    Ranked full-text search.
+
+    Args:
+        query: Free text entered by the user
+        kind: "course", "blog" or None for both
+        limit: Maximum number of hits
+        offset: Number of hits to skip
+
+    Returns:
+        tuple: (hits: list[dict], has_more: bool)
+
+    Raises:
+        SearchUnavailable: If the dialect has no full-text support
+    """
+    dialect = db.engine.dialect.name
+    template = _SEARCH_SQL.get(dialect)
+    if template is None:
+        raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+
+    if dialect == "sqlite":
+        query = _fts5_query(query)
+        if query is None:
+            return [], False
+
+    params = {
+        "query": query,
+        "limit": limit + 1,
+        "offset": offset,
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+    }
+    kind_filter = ""
+    if kind:
+        kind_filter = "AND kind = :kind "
+        params["kind"] = kind
+
+    rows = db.session.execute(text(template.format(kind_filter=kind_filter)), params).all()
+
+    hits = [
+        {
+            "type": row.kind,
+            "id": row.ref_id,
+            "title": row.title,
+            "snippet": _highlight(row.snippet),
+            # bm25() is lower-is-better; expose higher-is-better everywhere
+            "score": round(-row.rank if dialect == "sqlite" else row.rank, 6),
+        }
+        for row in rows[:limit]
+    ]
+    return hits, len(rows) > limit
+
+
+def _sync(kind, ids, action, index):
+    try:
+        if action == "deleted":
+            remove_documents(kind, ids)
+        else:
+            index(ids, replace=action != "created")
+        db.session.commit()
+    except Exception:
+        # The write itself already succeeded; a stale index is repaired by reindexing
+        db.session.rollback()
+        logger.exception("Failed to update search index for %s %s", kind, ids)
+
+
+@course_changed.connect
+def _on_course_changed(sender, ids=(), action=None, **kwargs):
+    _sync("course", list(ids), action, index_courses)
+
+
+@blog_changed.connect
+def _on_blog_changed(sender, ids=(), action=None, **kwargs):
+    _sync("blog", list(ids), action, index_blogs)
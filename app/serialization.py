@@ -0,0 +1,103 @@
+"""
+Model serialization helpers with sparse fieldset (`?fields=`) support.
+"""
+
+from flask import request
+from sqlalchemy.orm import load_only
+
+
+class InvalidFields(ValueError):
+    """Raised when the `fields` query parameter names unknown fields."""
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def to_float(value):
+    return float(value) if value is not None else None
+
+
+def list_or_empty(value):
+    return value or []
+
+
+class SerializerMixin:
+    """
+    Serialize a model from its `serializers` table.
+
+    `serializers` maps each public field name to a converter (or None to use
+    the attribute as-is). Field names are also column attribute names, which
+    lets a fieldset be turned directly into a column-limited SELECT.
+    """
+
+    serializers = {}
+
+    def to_dict(self, fields=None):
+        """
+        Serialize the model.
+
+        Args:
+            fields: Optional iterable of field names; only these attributes are read
+
+        Returns:
+            dict
+        """
+        serializers = self.serializers
+        data = {}
+        for name in fields or serializers:
+            convert = serializers[name]
+            value = getattr(self, name)
+            data[name] = convert(value) if convert else value
+        return data
+
+    @classmethod
+    def parse_fields(cls, raw_fields):
+        """
+        Parse a comma-separated fieldset.
+
+        Returns:
+            tuple|None: Field names in request order, or None for all fields
+
+        Raises:
+            InvalidFields: If a name is not a serialized field
+        """
+        if not raw_fields:
+            return None
+
+        fields = tuple(dict.fromkeys(name.strip() for name in raw_fields.split(",") if name.strip()))
+        unknown = [name for name in fields if name not in cls.serializers]
+        if unknown:
+            raise InvalidFields(
+                f"Unknown field(s): {', '.join(unknown)}. "
+                f"Valid fields: {', '.join(cls.serializers)}"
+            )
+        return fields or None
+
+    @classmethod
+    def load_only_fields(cls, fields, *extra_columns):
+        """
+        Query option that SELECTs only the columns behind `fields`.
+
+        Args:
+            fields: Field names from parse_fields
+            *extra_columns: Columns the route needs besides the fieldset,
+                e.g. the sort key used for keyset pagination
+
+        Returns:
+            Loader option for Query.options()
+        """
+        return load_only(*(getattr(cls, name) for name in fields), *extra_columns)
+
+
+def requested_fields(model):
+    """
+    Read the `fields` query parameter for `model`.
+
+    Returns:
+        tuple|None: Requested field names, or None when absent
+
+    Raises:
+        InvalidFields: If a name is not a serialized field of `model`
+    """
+    return model.parse_fields(request.args.get("fields"))
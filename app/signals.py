@@ -0,0 +1,15 @@
+"""
+Content change signals.
+
+Routes send these after a successful commit so caches and derived data can
+refresh without the routes knowing who depends on them. Receivers get the
+sender app plus `ids` (list of affected primary keys) and `action`
+("created", "updated" or "deleted").
+"""
+
+from blinker import Namespace
+
+_signals = Namespace()
+
+course_changed = _signals.signal("course-changed")
+blog_changed = _signals.signal("blog-changed")
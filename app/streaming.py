@@ -0,0 +1,114 @@
+"""
+Streaming JSON responses for large collections.
+
+Rows are fetched with `yield_per` and encoded one at a time, so neither the
+full list of dicts nor the full encoded body is ever held in memory.
+"""
+
+import csv
+import io
+from flask import current_app, stream_with_context
+from app.constants import STREAM_BATCH_SIZE
+
+
+def _encoded_items(rows, serialize):
+    dumps = current_app.json.dumps
+    for row in rows:
+        yield dumps(serialize(row), separators=(",", ":"))
+
+
+def _chunked(parts, batch_size=STREAM_BATCH_SIZE):
+    """Group small string parts into larger chunks to cut per-write overhead."""
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= batch_size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_json_array(rows, serialize):
+    """Yield the JSON encoding of [serialize(row) for row in rows] piece by piece."""
+    def parts():
+        yield "["
+        for index, item in enumerate(_encoded_items(rows, serialize)):
+            yield "," + item if index else item
+        yield "]"
+
+    return _chunked(parts())
+
+
+def iter_json_envelope(key, rows, serialize, **extra):
+    """
+    Yield {key: [...], "count": n, **extra} piece by piece.
+
+    The count is written after the array, once it is known.
+    """
+    dumps = current_app.json.dumps
+
+    def parts():
+        yield "{" + dumps(key) + ":["
+        count = 0
+        for item in _encoded_items(rows, serialize):
+            yield "," + item if count else item
+            count += 1
+        yield "]," + dumps("count") + ":" + dumps(count)
+        for name, value in extra.items():
+            yield "," + dumps(name) + ":" + dumps(value)
+        yield "}"
+
+    return _chunked(parts())
+
+
+def iter_ndjson(rows, serialize):
+    """Yield one JSON document per row, newline-delimited (application/x-ndjson)."""
+    return _chunked(item + "\n" for item in _encoded_items(rows, serialize))
+
+
+def iter_csv(rows, columns, serialize):
+    """
+    Yield a CSV document with a header row, then one line per row.
+
+    Args:
+        rows: Iterable of rows
+        columns: Column names, in order
+        serialize: Function mapping a row to a list of cell values
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    def parts():
+        yield line(columns)
+        for row in rows:
+            yield line(serialize(row))
+
+    return _chunked(parts())
+
+
+def stream_query(query, batch_size=STREAM_BATCH_SIZE):
+    """Iterate a query in batches instead of loading every row up front."""
+    return query.yield_per(batch_size)
+
+
+def streaming_json_response(chunks, status=200):
+    """Wrap a chunk generator in a streaming application/json response."""
+    return current_app.response_class(
+        stream_with_context(chunks), status=status, mimetype="application/json"
+    )
+
+
+def streaming_response(chunks, mimetype, filename=None):
+    """Wrap a chunk generator in a streaming response, optionally as a download."""
+    response = current_app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,220 @@
+"""
+Normalized tag index: keeps the tag/course_tag/blog_tag tables in sync with
+the JSON `tags` columns and turns `?tags=` filters into indexed lookups.
+
+Write paths call sync_tags()/remove_tags() before committing so the
+association rows change in the same transaction as the JSON column.
+"""
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from app.database import db
+from app.models import Blog, Course, Tag, blog_tag, course_tag
+
+# kind -> (model, association table, association foreign key column)
+TAGGED = {
+    "course": (Course, course_tag, course_tag.c.course_id),
+    "blog": (Blog, blog_tag, blog_tag.c.blog_id),
+}
+
+MATCH_MODES = ("any", "all")
+
+
+class InvalidTagFilter(ValueError):
+    """Raised when the `tags`/`match` query parameters are invalid."""
+
+
+def parse_tag_filter(args):
+    """
+    Read `tags` (comma-separated labels) and `match` (any|all) from query args.
+
+    Returns:
+        tuple|None: (slugs: list[str], match: str), or None when no filter was given
+
+    Raises:
+        InvalidTagFilter: If `match` is not "any" or "all"
+    """
+    raw_tags = args.get("tags")
+    if not raw_tags:
+        return None
+
+    match = args.get("match", "any").lower()
+    if match not in MATCH_MODES:
+        raise InvalidTagFilter(f"match must be one of: {', '.join(MATCH_MODES)}")
+
+    slugs = list(dict.fromkeys(Tag.slugify(label) for label in raw_tags.split(",") if label.strip()))
+    return (slugs, match) if slugs else None
+
+
+def filter_by_tags(query, kind, tag_filter):
+    """
+    Restrict a course or blog query to rows carrying the given tags.
+
+    Args:
+        query: Query over the model for `kind`
+        kind: "course" or "blog"
+        tag_filter: Result of parse_tag_filter(), or None for no filtering
+    """
+    if not tag_filter:
+        return query
+
+    slugs, match = tag_filter
+    model, _, foreign_key = TAGGED[kind]
+    matching = (
+        select(foreign_key)
+        .join(Tag, Tag.id == foreign_key.table.c.tag_id)
+        .where(Tag.slug.in_(slugs))
+    )
+    if match == "all":
+        matching = matching.group_by(foreign_key).having(
+            func.count(Tag.id) == len(slugs)
+        )
+    return query.filter(model.id.in_(matching))
+
+
+def _tag_entries(tags):
+    """Map slug -> (label, color) for a JSON tags value, skipping malformed entries."""
+    entries = {}
+    for tag in tags or []:
+        if not isinstance(tag, dict) or not isinstance(tag.get("label"), str):
+            continue
+        label = tag["label"].strip()
+        if label:
+            entries.setdefault(Tag.slugify(label), (label, tag.get("color")))
+    return entries
+
+
+def _ensure_tags(entries):
+    """
+    Get or create Tag rows for the given entries.
+
+    Returns:
+        dict: slug -> tag id
+    """
+    if not entries:
+        return {}
+
+    for _ in range(2):
+        # A tag's label and color are set when it is created: other items
+        # using the same tag do not change them
+        existing = {
+            tag.slug: tag
+            for tag in Tag.query.filter(Tag.slug.in_(list(entries))).all()
+        }
+        missing = [slug for slug in entries if slug not in existing]
+        if not missing:
+            return {slug: tag.id for slug, tag in existing.items()}
+
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    insert(Tag),
+                    [
+                        {"slug": slug, "label": entries[slug][0], "color": entries[slug][1]}
+                        for slug in missing
+                    ],
+                )
+        except IntegrityError:
+            # Another worker created some of these tags; look them up again
+            continue
+
+    return {
+        tag.slug: tag.id
+        for tag in Tag.query.filter(Tag.slug.in_(list(entries))).all()
+    }
+
+
+def sync_tags(kind, ids):
+    """Rebuild the association rows of the given courses or blogs. Does not commit."""
+    if not ids:
+        return
+
+    model, association, foreign_key = TAGGED[kind]
+    rows = db.session.execute(select(model.id, model.tags).where(model.id.in_(ids))).all()
+    entries_by_id = {row_id: _tag_entries(tags) for row_id, tags in rows}
+
+    all_entries = {}
+    for entries in entries_by_id.values():
+        for slug, entry in entries.items():
+            all_entries.setdefault(slug, entry)
+    tag_ids = _ensure_tags(all_entries)
+
+    db.session.execute(delete(association).where(foreign_key.in_(ids)))
+    links = [
+        {foreign_key.key: row_id, "tag_id": tag_ids[slug]}
+        for row_id, entries in entries_by_id.items()
+        for slug in entries
+        if slug in tag_ids
+    ]
+    if links:
+        db.session.execute(insert(association), links)
+
+
+def remove_tags(kind, ids):
+    """Delete the association rows of removed courses or blogs. Does not commit."""
+    if not ids:
+        return
+    _, association, foreign_key = TAGGED[kind]
+    db.session.execute(delete(association).where(foreign_key.in_(ids)))
+
+
+def rebuild_all(batch_size=500):
+    """
+    Resync every association row from the JSON columns.
+
+    Run after scripts that rewrite tags directly (e.g. limit_to_5_tags.py).
+
+    Returns:
+        dict: Number of synced rows per kind
+    """
+    counts = {}
+    for kind, (model, _, _) in TAGGED.items():
+        ids = [row[0] for row in db.session.execute(select(model.id).order_by(model.id))]
+        for start in range(0, len(ids), batch_size):
+            sync_tags(kind, ids[start:start + batch_size])
+        counts[kind] = len(ids)
+    db.session.commit()
+    return counts
+
+
+def tag_counts(kind=None):
+    """
+    Number of courses and blogs per tag, most used first.
+
+    Args:
+        kind: "course" or "blog" to only return tags used by that kind
+
+    Returns:
+        list[dict]: [{"label", "color", "courses", "blogs"}, ...]
+    """
+    course_counts = (
+        select(course_tag.c.tag_id, func.count().label("total"))
+        .group_by(course_tag.c.tag_id)
+        .subquery()
+    )
+    blog_counts = (
+        select(blog_tag.c.tag_id, func.count().label("total"))
+        .group_by(blog_tag.c.tag_id)
+        .subquery()
+    )
+    courses = func.coalesce(course_counts.c.total, 0)
+    blogs = func.coalesce(blog_counts.c.total, 0)
+
+    statement = (
+        select(Tag, courses.label("courses"), blogs.label("blogs"))
+        .outerjoin(course_counts, course_counts.c.tag_id == Tag.id)
+        .outerjoin(blog_counts, blog_counts.c.tag_id == Tag.id)
+    )
+    if kind == "course":
+        statement = statement.where(courses > 0).order_by(courses.desc(), Tag.label)
+    elif kind == "blog":
+        statement = statement.where(blogs > 0).order_by(blogs.desc(), Tag.label)
+    else:
+        statement = statement.where(or_(courses > 0, blogs > 0)).order_by(
+            (courses + blogs).desc(), Tag.label
+        )
+
+    return [
+        {**tag.to_dict(), "courses": course_total, "blogs": blog_total}
+        for tag, course_total, blog_total in db.session.execute(statement)
+    ]
@@ -0,0 +1,137 @@
+"""
+Loading and caching users.
+
+- Within a request, a user row is loaded at most once: the authenticated user
+  is kept in `g.current_user` (set by the auth decorators, or on first use),
+  and load_user() serves other ids from the session's identity map.
+- Across requests, each worker keeps serialized users (all public fields
+  plus the id lists) in an LRU keyed by user id and stamped with the row's
+  `version`. Every change to a user or its lists bumps the version
+  (bump_version) and drops this worker's entry once the transaction commits;
+  other workers re-check the version with a one-column primary-key read at
+  most every USER_CACHE_VERSION_CHECK_SECONDS.
+"""
+
+import time
+from flask import abort, g
+from sqlalchemy import event, select, update
+from app.cache import TTLCache
+from app.constants import (
+    USER_CACHE_MAX_ENTRIES,
+    USER_CACHE_TTL_SECONDS,
+    USER_CACHE_VERSION_CHECK_SECONDS,
+)
+from app.database import db
+from app.models import User
+
+# user id -> (version, serialized user, monotonic time of the last version check)
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+# Key in Session.info of the ids whose entries are dropped when the session commits
+_PENDING_KEY = "user_cache_forget"
+
+
+def current_user():
+    """The authenticated user of this request (None if unauthenticated or deleted)."""
+    if "current_user" not in g:
+        user_id = g.get("current_user_id")
+        g.current_user = db.session.get(User, user_id) if user_id is not None else None
+    return g.current_user
+
+
+def load_user(user_id):
+    """User row for this request, loaded at most once, or 404."""
+    if user_id == g.get("current_user_id"):
+        user = current_user()
+    else:
+        user = db.session.get(User, user_id)
+    if user is None:
+        abort(404)
+    return user
+
+
+def _stored_version(user_id):
+    return db.session.execute(select(User.version).where(User.id == user_id)).scalar()
+
+
+def _load(user_id):
+    user = (
+        User.query.options(*User.with_lists())
+        .filter_by(id=user_id)
+        .populate_existing()
+        .one_or_none()
+    )
+    if user is None:
+        return None
+    payload = user.to_dict()
+    user_cache.set(user_id, (user.version, payload, time.monotonic()))
+    return payload
+
+
+def cached_user(user_id):
+    """
+    Serialized user (User.to_dict()) from the cache.
+
+    Returns:
+        dict|None: None if the user does not exist. Callers must not mutate it.
+    """
+    entry = user_cache.get(user_id)
+    if entry is None:
+        return _load(user_id)
+
+    version, payload, checked_at = entry
+    now = time.monotonic()
+    if now - checked_at < USER_CACHE_VERSION_CHECK_SECONDS:
+        return payload
+
+    stored = _stored_version(user_id)
+    if stored is None:
+        user_cache.delete(user_id)
+        return None
+    if stored != version:
+        return _load(user_id)
+    user_cache.set(user_id, (version, payload, now))
+    return payload
+
+
+def cached_user_or_404(user_id):
+    payload = cached_user(user_id)
+    if payload is None:
+        abort(404)
+    return payload
+
+
+def bump_version(*user_ids):
+    """
+    Mark users as changed, in the current transaction. Does not commit.
+
+    This worker's entries are dropped when the transaction commits (dropping
+    them earlier would let a concurrent request cache the old row again);
+    other workers notice the new version on their next check.
+    """
+    if not user_ids:
+        return
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(version=User.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+def forget(*user_ids):
+    """Drop this worker's cached entries."""
+    for user_id in user_ids:
+        user_cache.delete(user_id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _forget_committed(session):
+    forget(*session.info.pop(_PENDING_KEY, ()))
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,121 @@
+"""
+Filters and export formats of the admin user listing (GET /users).
+
+Every filter is an indexed predicate: role and created_at ranges narrow the
+(created_at, id) keyset scan, and a username prefix becomes a range on the
+username index.
+"""
+
+import sys
+from datetime import datetime, timezone
+from app.models import User
+from app.pagination import bind_value
+
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class InvalidUserFilter(ValueError):
+    """Raised when a filter or format query parameter of GET /users is invalid."""
+
+
+def parse_format(args):
+    """
+    Read `format` from query args.
+
+    Returns:
+        str: One of EXPORT_FORMATS ("json" by default)
+
+    Raises:
+        InvalidUserFilter: If the format is unknown
+    """
+    value = args.get("format", "json").lower()
+    if value not in EXPORT_FORMATS:
+        raise InvalidUserFilter(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return value
+
+
+def _parse_datetime(args, name):
+    raw = args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        raise InvalidUserFilter(f"{name} must be an ISO 8601 date or datetime")
+    if value.tzinfo is not None:
+        # Timestamps are stored in UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _prefix_upper_bound(prefix):
+    """
+    Smallest string greater than every string starting with `prefix`.
+
+    Returns:
+        str|None: The bound, or None if there is none (the prefix is only
+            U+10FFFF characters)
+    """
+    # A last character of U+10FFFF cannot be incremented: bump the one before
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    next_code = ord(prefix[-1]) + 1
+    if 0xD800 <= next_code <= 0xDFFF:
+        # Surrogates cannot be encoded: skip to the next character after them
+        next_code = 0xE000
+    return prefix[:-1] + chr(next_code)
+
+
+def filter_users(query, args):
+    """
+    Apply the listing filters from query args.
+
+    Query params:
+    - role: Exact role
+    - created_after: Users created at or after this ISO 8601 date/datetime
+    - created_before: Users created before this ISO 8601 date/datetime
+    - username: Username prefix (case-sensitive)
+
+    Raises:
+        InvalidUserFilter: If a date cannot be parsed
+    """
+    role = args.get("role")
+    if role:
+        query = query.filter(User.role == role)
+
+    created_after = _parse_datetime(args, "created_after")
+    if created_after:
+        query = query.filter(User.created_at >= bind_value(created_after))
+    created_before = _parse_datetime(args, "created_before")
+    if created_before:
+        query = query.filter(User.created_at < bind_value(created_before))
+
+    prefix = args.get("username")
+    if prefix:
+        # The range is what the username index can scan; startswith keeps
+        # the match exact under collations that order characters differently
+        query = query.filter(User.username >= prefix, User.username.startswith(prefix, autoescape=True))
+        upper_bound = _prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            query = query.filter(User.username < upper_bound)
+    return query
+
+
+def _csv_safe(value):
+    # Spreadsheets run cells starting with these as formulas: quote them as text
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_cells(user, fields):
+    """One CSV row of a user; id lists are joined with spaces."""
+    cells = []
+    for name, value in user.to_dict(fields).items():
+        if name in User.LIST_FIELDS:
+            value = " ".join(str(item_id) for item_id in value)
+        cells.append("" if value is None else _csv_safe(value))
+    return cells
@@ -0,0 +1,351 @@
+"""
+A user's owned courses, favourite courses and saved blogs.
+
+Each list is a table of (user_id, item_id, position) rows: membership is a
+primary-key lookup, adding an entry inserts one row and removing one deletes
+one row, whatever the length of the list.
+
+Expanded lists (profile pages, ?expand=true) are read with one UNION ALL
+statement that joins every requested list to its course or blog card
+columns, instead of one query per list.
+
+Batch changes (apply_change) validate every id with one IN query and apply
+all deletes, inserts and reorders in the caller's transaction.
+"""
+
+from sqlalchemy import delete, func, insert, inspect, literal, null, select, type_coerce, union_all, update
+from sqlalchemy.exc import IntegrityError
+from app.constants import MAX_LIST_CHANGE_ITEMS
+from app.database import db
+from app.models import Blog, Course, FavouriteCourse, OwnedCourse, SavedBlog, User
+from app.user_cache import bump_version
+
+# list name -> (entry model, item model)
+LISTS = {
+    "owned_courses": (OwnedCourse, Course),
+    "favourite_courses": (FavouriteCourse, Course),
+    "saved_blogs": (SavedBlog, Blog),
+}
+
+# item model -> fields of the expanded entries
+CARD_FIELDS = {
+    Course: Course.CARD_FIELDS,
+    Blog: Blog.SUMMARY_FIELDS,
+}
+
+
+class InvalidListChange(ValueError):
+    """Raised when the body of a batch list change is malformed."""
+
+
+class UnknownItems(InvalidListChange):
+    """Raised when a batch list change names courses or blogs that do not exist."""
+
+    def __init__(self, item_ids):
+        self.item_ids = item_ids
+        super().__init__(f"Not found: {', '.join(str(item_id) for item_id in item_ids)}")
+
+
+def _id_list(data, key):
+    ids = data.get(key, [])
+    if not isinstance(ids, list):
+        raise InvalidListChange(f"{key} must be a list of ids")
+    if any(isinstance(item_id, bool) or not isinstance(item_id, int) for item_id in ids):
+        raise InvalidListChange(f"{key} must contain only integer ids")
+    if len(ids) > MAX_LIST_CHANGE_ITEMS:
+        raise InvalidListChange(f"{key} may contain at most {MAX_LIST_CHANGE_ITEMS} ids")
+    return list(dict.fromkeys(ids))
+
+
+def parse_change(data):
+    """
+    Read a batch list change from a JSON body.
+
+    The body is either {"replace": [ids]}, the whole list in order, or
+    {"add": [ids], "remove": [ids]}, where added ids go to the end of the list.
+
+    Returns:
+        tuple: (replace: list[int]|None, add: list[int], remove: list[int])
+
+    Raises:
+        InvalidListChange: If the body is malformed or an id is both added and removed
+    """
+    if not isinstance(data, dict):
+        raise InvalidListChange("Request body must be a JSON object")
+    if "replace" in data:
+        if "add" in data or "remove" in data:
+            raise InvalidListChange("replace cannot be combined with add or remove")
+        return _id_list(data, "replace"), [], []
+    if "add" not in data and "remove" not in data:
+        raise InvalidListChange("One of replace, add or remove is required")
+
+    add_ids, remove_ids = _id_list(data, "add"), _id_list(data, "remove")
+    both = set(add_ids) & set(remove_ids)
+    if both:
+        raise InvalidListChange(
+            f"Ids both added and removed: {', '.join(str(item_id) for item_id in sorted(both))}"
+        )
+    return None, add_ids, remove_ids
+
+
+def lock_user(user_id):
+    """
+    Lock the user row until the end of the transaction, so concurrent changes
+    to the same user's lists apply one after the other (no-op on SQLite, where
+    writers are serialized anyway).
+    """
+    db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+
+def contains(list_name, user_id, item_id):
+    """Whether the item is in the user's list."""
+    model, _ = LISTS[list_name]
+    return db.session.get(model, (user_id, item_id)) is not None
+
+
+def members(list_name, user_id, item_ids):
+    """
+    Which of `item_ids` are in the user's list, in one indexed query.
+
+    Returns:
+        set[int]
+    """
+    model, _ = LISTS[list_name]
+    if not item_ids:
+        return set()
+    return set(db.session.execute(
+        select(model.item_id).where(model.user_id == user_id, model.item_id.in_(item_ids))
+    ).scalars())
+
+
+def add(list_name, user_id, item_ids):
+    """
+    Append items to the end of a user's list and bump the user's version.
+    Does not commit.
+
+    Items already in the list and ids of items that do not exist are skipped.
+
+    Returns:
+        list[int]: Ids actually added, in the order given
+    """
+    model, item_model = LISTS[list_name]
+    item_ids = list(dict.fromkeys(item_ids))
+    if not item_ids:
+        return []
+
+    existing = set(db.session.execute(
+        select(item_model.id).where(item_model.id.in_(item_ids))
+    ).scalars())
+    lock_user(user_id)
+    present = members(list_name, user_id, item_ids)
+    new_ids = [item_id for item_id in item_ids if item_id in existing and item_id not in present]
+    if not new_ids:
+        return []
+
+    next_position = db.session.execute(
+        select(func.coalesce(func.max(model.position) + 1, 0)).where(model.user_id == user_id)
+    ).scalar_one()
+    entries = [
+        model(user_id=user_id, item_id=item_id, position=next_position + offset)
+        for offset, item_id in enumerate(new_ids)
+    ]
+    try:
+        with db.session.begin_nested():
+            db.session.add_all(entries)
+    except IntegrityError:
+        # A concurrent request added some of them first: add the rest one by one
+        added = []
+        for entry in entries:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(model(user_id=user_id, item_id=entry.item_id, position=entry.position))
+                added.append(entry.item_id)
+            except IntegrityError:
+                pass
+        if added:
+            bump_version(user_id)
+        return added
+    bump_version(user_id)
+    return new_ids
+
+
+def _missing_items(item_model, item_ids):
+    """Ids (in order) that have no course or blog row, checked with one IN query."""
+    existing = set(db.session.execute(
+        select(item_model.id).where(item_model.id.in_(item_ids))
+    ).scalars())
+    return [item_id for item_id in item_ids if item_id not in existing]
+
+
+def apply_change(list_name, user_id, replace=None, add=(), remove=()):
+    """
+    Apply a batch change to a user's list and bump the user's version if
+    anything changed. Does not commit.
+
+    Args:
+        list_name: Key of LISTS
+        user_id: Id of the user
+        replace: Every id of the new list, in order; None to apply add/remove
+        add: Ids to append, in order; ids already in the list are kept where they are
+        remove: Ids to remove; ids not in the list are ignored
+
+    Returns:
+        dict: {"added": [ids], "removed": [ids]}
+
+    Raises:
+        UnknownItems: If an added or replacement id does not exist, or is
+            deleted while the change is applied; nothing is changed
+    """
+    model, item_model = LISTS[list_name]
+    # Bulk statements take column names, not the item_id synonym
+    item_key = inspect(model).synonyms["item_id"].name
+    wanted = list(replace) if replace is not None else list(add)
+
+    if wanted:
+        missing = _missing_items(item_model, wanted)
+        if missing:
+            raise UnknownItems(missing)
+
+    lock_user(user_id)
+    current = dict(db.session.execute(
+        select(model.item_id, model.position)
+        .where(model.user_id == user_id)
+        .order_by(model.position)
+    ).all())
+
+    if replace is not None:
+        target = set(replace)
+        removed = [item_id for item_id in current if item_id not in target]
+        added = [item_id for item_id in replace if item_id not in current]
+        positions = {item_id: position for position, item_id in enumerate(replace)}
+        # Kept entries are renumbered only where the order changed
+        moved = [
+            item_id for item_id, position in current.items()
+            if item_id in target and position != positions[item_id]
+        ]
+    else:
+        removed = [item_id for item_id in remove if item_id in current]
+        added = [item_id for item_id in add if item_id not in current]
+        next_position = max(current.values(), default=-1) + 1
+        positions = {item_id: next_position + offset for offset, item_id in enumerate(added)}
+        moved = []
+
+    try:
+        with db.session.begin_nested():
+            if removed:
+                db.session.execute(
+                    delete(model).where(model.user_id == user_id, model.item_id.in_(removed))
+                )
+            if moved:
+                # Bulk UPDATE by primary key, one executemany
+                db.session.execute(
+                    update(model),
+                    [{"user_id": user_id, item_key: item_id, "position": positions[item_id]}
+                     for item_id in moved],
+                )
+            if added:
+                db.session.execute(
+                    insert(model),
+                    [{"user_id": user_id, item_key: item_id, "position": positions[item_id]}
+                     for item_id in added],
+                )
+    except IntegrityError:
+        # An item was deleted after the check above: its foreign key failed
+        missing = _missing_items(item_model, added)
+        if missing:
+            raise UnknownItems(missing)
+        raise
+
+    if removed or added or moved:
+        bump_version(user_id)
+    return {"added": added, "removed": removed}
+
+
+def remove(list_name, user_id, item_id):
+    """
+    Remove an item from a user's list and bump the user's version. Does not commit.
+
+    Returns:
+        bool: Whether the item was in the list
+    """
+    model, _ = LISTS[list_name]
+    result = db.session.execute(
+        delete(model).where(model.user_id == user_id, model.item_id == item_id)
+    )
+    if result.rowcount == 0:
+        return False
+    bump_version(user_id)
+    return True
+
+
+def remove_items(kind, ids):
+    """Drop deleted courses or blogs from every user's lists. Does not commit."""
+    models = (OwnedCourse, FavouriteCourse) if kind == "course" else (SavedBlog,)
+    affected = set()
+    for model in models:
+        # The (item_id, user_id) index answers "who has these items"
+        affected.update(db.session.execute(
+            delete(model).where(model.item_id.in_(ids)).returning(model.user_id)
+        ).scalars())
+    bump_version(*affected)
+
+
+def _card_columns():
+    """Every card field of every item model, with the column type to read it as."""
+    columns = {}
+    for item_model, fields in CARD_FIELDS.items():
+        for name in fields:
+            columns.setdefault(name, getattr(item_model, name).type)
+    return columns
+
+
+def expanded(user_id, list_names=None):
+    """
+    Course and blog cards of a user's lists, in list order, in one query.
+
+    Args:
+        user_id: Id of the user
+        list_names: Lists to expand; all by default
+
+    Returns:
+        dict: list name -> [card dict, ...]
+    """
+    list_names = list(list_names or LISTS)
+    columns = _card_columns()
+
+    selects = []
+    for list_name in list_names:
+        model, item_model = LISTS[list_name]
+        fields = CARD_FIELDS[item_model]
+        # Fields the item model does not have are padded with typed NULLs so
+        # every branch of the UNION has the same columns
+        card = [
+            getattr(item_model, name).label(name) if name in fields
+            else type_coerce(null(), column_type).label(name)
+            for name, column_type in columns.items()
+        ]
+        selects.append(
+            select(
+                literal(list_name, literal_execute=True).label("list_name"),
+                model.position.label("position"),
+                *card,
+            )
+            .join_from(model, item_model, model.item_id == item_model.id)
+            .where(model.user_id == user_id)
+        )
+
+    statement = union_all(*selects) if len(selects) > 1 else selects[0]
+    cards = {list_name: [] for list_name in list_names}
+    for row in db.session.execute(statement).mappings():
+        item_model = LISTS[row["list_name"]][1]
+        serializers = item_model.serializers
+        card = {}
+        for name in CARD_FIELDS[item_model]:
+            convert = serializers[name]
+            card[name] = convert(row[name]) if convert else row[name]
+        cards[row["list_name"]].append((row["position"], card))
+
+    return {
+        list_name: [card for _, card in sorted(entries, key=lambda entry: entry[0])]
+        for list_name, entries in cards.items()
+    }
@@ -3,6 +3,19 @@ Validation utilities for user input.
 """
 
 import re
+from decimal import Decimal, InvalidOperation
+from app.constants import (
+    MAX_BLOG_CONTENT_LENGTH,
+    MAX_BLOG_DESCRIPTION_LENGTH,
+    MAX_BLOG_TITLE_LENGTH,
+    MAX_COURSE_LEVEL_LENGTH,
+    MAX_COURSE_NAME_LENGTH,
+    MAX_COURSE_PRICE,
+    MAX_COURSE_TOPIC_LENGTH,
+    MAX_IMAGE_FIELD_LENGTH,
+    MAX_TAG_COLOR_LENGTH,
+    MAX_TAG_LABEL_LENGTH,
+)
 
 # Constants for validation
 MIN_USERNAME_LENGTH = 3
@@ -106,3 +119,140 @@ def validate_string_field(value, field_name, max_length, required=True):
         return False, f"{field_name} must be less than {max_length} characters"
 
     return True, None
+
+
+def validate_tags(tags):
+    """
+    Validate a tags value: a list of {"label", "color"} objects that fit the tag table.
+
+    Args:
+        tags: Value to validate (None means no tags)
+
+    Returns:
+        tuple: (is_valid: bool, error_message: str|None)
+    """
+    if tags is None:
+        return True, None
+    if not isinstance(tags, list):
+        return False, "tags must be a list"
+    for tag in tags:
+        if not isinstance(tag, dict) or not isinstance(tag.get("label"), str):
+            return False, "Each tag must be an object with a string label"
+        # The slug (Tag.slugify) can be longer than the label once lower-cased
+        label = tag["label"].strip()
+        if max(len(label), len(label.lower())) > MAX_TAG_LABEL_LENGTH:
+            return False, f"Tag labels must be at most {MAX_TAG_LABEL_LENGTH} characters"
+        color = tag.get("color")
+        if color is not None and (not isinstance(color, str) or len(color) > MAX_TAG_COLOR_LENGTH):
+            return False, f"Tag colors must be strings of at most {MAX_TAG_COLOR_LENGTH} characters"
+    return True, None
+
+
+BLOG_FIELD_CHECKS = {
+    "title": lambda value: validate_string_field(value, "Title", MAX_BLOG_TITLE_LENGTH),
+    "author_name": lambda value: validate_string_field(value, "Author name", 100),
+    "email": validate_email,
+    "url": lambda value: validate_string_field(value, "URL", 255),
+    "description": lambda value: validate_string_field(
+        value, "Description", MAX_BLOG_DESCRIPTION_LENGTH
+    ),
+    "content": lambda value: validate_string_field(value, "Content", MAX_BLOG_CONTENT_LENGTH),
+    "tags": validate_tags,
+}
+
+
+def validate_blog_data(data, fields=None):
+    """
+    Validate the fields of a blog (POST /blogs, PATCH /blogs/<id> and bulk imports).
+
+    Args:
+        data: Blog fields as received
+        fields: Only check these fields (the ones a patch changed); all by default
+
+    Returns:
+        tuple: (is_valid: bool, error_message: str|None)
+    """
+    for field, check in BLOG_FIELD_CHECKS.items():
+        if fields is not None and field not in fields:
+            continue
+        is_valid, error = check(data.get(field))
+        if not is_valid:
+            return False, error
+    return True, None
+
+
+def validate_number_field(value, field_name, max_value, min_value=0):
+    """
+    Validate a decimal field: a finite number (or numeric string) in range.
+
+    Args:
+        value: Value to validate
+        field_name: Name of the field (for error messages)
+        max_value: Maximum allowed value
+        min_value: Minimum allowed value
+
+    Returns:
+        tuple: (is_valid: bool, error_message: str|None)
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        return False, f"{field_name} must be a number"
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        return False, f"{field_name} must be a number"
+    if not number.is_finite():
+        return False, f"{field_name} must be a finite number"
+    if number < Decimal(str(min_value)) or number > Decimal(str(max_value)):
+        return False, f"{field_name} must be between {min_value} and {max_value}"
+    return True, None
+
+
+def _validate_text(value, field_name):
+    if not isinstance(value, str) or not value:
+        return False, f"{field_name} must be a non-empty string"
+    return True, None
+
+
+COURSE_REQUIRED_FIELDS = ("name", "price", "discount", "topic", "level", "description")
+
+# Lengths follow the column sizes of Course
+COURSE_FIELD_CHECKS = {
+    "name": lambda value: validate_string_field(value, "Name", MAX_COURSE_NAME_LENGTH),
+    "price": lambda value: validate_number_field(value, "Price", MAX_COURSE_PRICE),
+    "discount": lambda value: validate_number_field(value, "Discount", MAX_COURSE_PRICE),
+    "topic": lambda value: validate_string_field(value, "Topic", MAX_COURSE_TOPIC_LENGTH),
+    "level": lambda value: validate_string_field(value, "Level", MAX_COURSE_LEVEL_LENGTH),
+    "description": lambda value: _validate_text(value, "Description"),
+    "image_url": lambda value: validate_string_field(
+        value, "Image URL", MAX_IMAGE_FIELD_LENGTH, required=False
+    ),
+    "image_alt": lambda value: validate_string_field(
+        value, "Image alt", MAX_IMAGE_FIELD_LENGTH, required=False
+    ),
+    "tags": validate_tags,
+}
+
+
+def validate_course_data(data, fields=None):
+    """
+    Validate the fields of a course (POST /courses, PATCH /courses/<id> and bulk imports).
+
+    Args:
+        data: Course fields as received
+        fields: Only check these fields (the ones a patch changed); all by default
+
+    Returns:
+        tuple: (is_valid: bool, error_message: str|None)
+    """
+    for field in COURSE_REQUIRED_FIELDS:
+        if fields is not None and field not in fields:
+            continue
+        if field not in data or data[field] is None:
+            return False, f"Missing required field: {field}"
+    for field, check in COURSE_FIELD_CHECKS.items():
+        if fields is not None and field not in fields:
+            continue
+        is_valid, error = check(data.get(field))
+        if not is_valid:
+            return False, error
+    return True, None
@@ -5,6 +5,7 @@ Safe to run multiple times - checks if admin exists first
 from app import create_app
 from app.database import db
 from app.models import User
+from app.user_cache import bump_version
 from werkzeug.security import generate_password_hash
 import os
 
@@ -24,6 +25,7 @@ with app.app_context():
         # Update role to admin if it's not already
         if admin_user.role != "admin":
             admin_user.role = "admin"
+            bump_version(admin_user.id)
             db.session.commit()
             print(f"✓ Updated role to 'admin'")
     else:
@@ -34,9 +36,6 @@ with app.app_context():
             email=admin_email,
             password_hash=generate_password_hash(admin_password),
             role="admin",
-            owned_courses=[],
-            favourite_courses=[],
-            saved_blogs=[],
         )
         db.session.add(new_admin)
         db.session.commit()
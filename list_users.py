@@ -1,16 +1,23 @@
 """
 Script to list all users in the database
+
+Users are read in batches, so the whole table is never loaded at once. For
+reports, prefer the admin export: GET /users?format=csv (or format=ndjson).
 """
 from app import create_app
 from app.database import db
 from app.models import User
+from app.streaming import stream_query
 
 app = create_app()
 
 with app.app_context():
-    users = User.query.all()
+    query = User.query.options(User.load_only_fields(User.SCALAR_FIELDS)).order_by(User.id)
 
-    print(f"\nFound {len(users)} users in database:\n")
-    for user in users:
+    print("\nUsers in database:\n")
+    count = 0
+    for user in stream_query(query):
         role = getattr(user, 'role', 'N/A')
         print(f"ID: {user.id}, Username: {user.username}, Email: {user.email}, Role: {role}")
+        count += 1
+    print(f"\nFound {count} users.")
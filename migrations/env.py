@@ -38,7 +38,7 @@ def get_engine_url():
 # target_metadata = mymodel.Base.metadata
 
 # Import all models so Alembic can detect them
-from app.models import User, Course, Blog, Contact, Purchase
+from app.models import User, Course, Blog, Contact, Purchase, CacheVersion, Tag, RenderedMarkdown, RelatedItems, ContentStats, OwnedCourse, FavouriteCourse, SavedBlog, IdempotencyKey
 
 config.set_main_option('sqlalchemy.url', get_engine_url())
 target_db = current_app.extensions['migrate'].db
@@ -94,9 +94,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # The search index is created with raw DDL (an FTS5 virtual table on
+    # SQLite), so keep autogenerate from trying to drop it
+    def include_name(name, type_, parent_names):
+        if type_ == "table":
+            return not (name or "").startswith("search_index")
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
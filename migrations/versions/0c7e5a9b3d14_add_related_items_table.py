@@ -0,0 +1,36 @@
+"""Add related_items table for precomputed related content
+
+Revision ID: 0c7e5a9b3d14
+Revises: f6a1c8d3e592
+Create Date: 2026-10-17 17:05:52.663018
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c7e5a9b3d14'
+down_revision = 'f6a1c8d3e592'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('related_items',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('neighbors', sa.JSON(), nullable=False),
+    sa.Column('built_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'item_id')
+    )
+    cache_versions = sa.table('cache_versions',
+    sa.column('name', sa.String),
+    sa.column('version', sa.Integer)
+    )
+    op.bulk_insert(cache_versions, [{'name': 'related', 'version': 0}])
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'related'")
+    op.drop_table('related_items')
@@ -0,0 +1,26 @@
+"""Add composite index for user keyset pagination
+
+Revision ID: 2b8e6d4a1c97
+Revises: 9e4c2b7f5a13
+Create Date: 2026-10-17 19:20:41.538106
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8e6d4a1c97'
+down_revision = '9e4c2b7f5a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
@@ -0,0 +1,28 @@
+"""Add composite indexes for course keyset pagination
+
+Revision ID: 3f9c1d2a7b41
+Revises: 54a8914b84e9
+Create Date: 2026-10-17 10:12:04.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c1d2a7b41'
+down_revision = '54a8914b84e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.create_index('ix_course_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_course_topic_created_at_id', ['topic', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('course', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_topic_created_at_id')
+        batch_op.drop_index('ix_course_created_at_id')
@@ -0,0 +1,26 @@
+"""Add version column to users for the user cache
+
+Revision ID: 6f1a3d9c8e25
+Revises: 2b8e6d4a1c97
+Create Date: 2026-10-17 19:48:12.370514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1a3d9c8e25'
+down_revision = '2b8e6d4a1c97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,30 @@
+"""Add content_stats table for buffered view counters
+
+Revision ID: 7d3f9b1e6a28
+Revises: 0c7e5a9b3d14
+Create Date: 2026-10-17 17:46:30.118742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f9b1e6a28'
+down_revision = '0c7e5a9b3d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('content_stats',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('views', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'item_id')
+    )
+
+
+def downgrade():
+    op.drop_table('content_stats')
@@ -0,0 +1,30 @@
+"""Add cache_versions table for cross-worker cache invalidation
+
+Revision ID: 8b2e4f6a9c13
+Revises: 3f9c1d2a7b41
+Create Date: 2026-10-17 11:02:47.530114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f6a9c13'
+down_revision = '3f9c1d2a7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'catalog', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,103 @@
+"""Move owned courses, favourite courses and saved blogs to association tables
+
+Revision ID: 9e4c2b7f5a13
+Revises: 7d3f9b1e6a28
+Create Date: 2026-10-17 18:52:07.604219
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4c2b7f5a13'
+down_revision = '7d3f9b1e6a28'
+branch_labels = None
+depends_on = None
+
+# JSON column -> (table, item column, item table)
+LISTS = (
+    ('owned_courses', 'user_owned_course', 'course_id', 'course'),
+    ('favourite_courses', 'user_favourite_course', 'course_id', 'course'),
+    ('saved_blogs', 'user_saved_blog', 'blog_id', 'blog'),
+)
+
+
+def _load_ids(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, int) and not isinstance(item, bool)]
+
+
+def upgrade():
+    tables = {}
+    for _, table, item_column, item_table in LISTS:
+        tables[table] = op.create_table(table,
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column(item_column, sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint([item_column], [f'{item_table}.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', item_column)
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{table}_{item_column}_user_id', [item_column, 'user_id'], unique=False)
+
+    # Copy the JSON lists, keeping their order; ids of deleted items and
+    # duplicates are dropped
+    bind = op.get_bind()
+    existing = {
+        'course': {row[0] for row in bind.execute(sa.text('SELECT id FROM course'))},
+        'blog': {row[0] for row in bind.execute(sa.text('SELECT id FROM blog'))},
+    }
+    rows = {table: [] for _, table, _, _ in LISTS}
+    users = bind.execute(sa.text('SELECT id, owned_courses, favourite_courses, saved_blogs FROM users'))
+    for user_id, *lists in users:
+        for raw_ids, (_, table, item_column, item_table) in zip(lists, LISTS):
+            item_ids = [
+                item_id for item_id in dict.fromkeys(_load_ids(raw_ids))
+                if item_id in existing[item_table]
+            ]
+            rows[table].extend(
+                {'user_id': user_id, item_column: item_id, 'position': position}
+                for position, item_id in enumerate(item_ids)
+            )
+    for table, table_rows in rows.items():
+        if table_rows:
+            op.bulk_insert(tables[table], table_rows)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        for column, _, _, _ in LISTS:
+            batch_op.drop_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        for column, _, _, _ in LISTS:
+            batch_op.add_column(sa.Column(column, sa.JSON(), server_default='[]', nullable=False))
+
+    bind = op.get_bind()
+    for column, table, item_column, _ in LISTS:
+        lists = {}
+        for user_id, item_id in bind.execute(
+            sa.text(f'SELECT user_id, {item_column} FROM {table} ORDER BY user_id, position')
+        ):
+            lists.setdefault(user_id, []).append(item_id)
+        for user_id, item_ids in lists.items():
+            bind.execute(
+                sa.text(f'UPDATE users SET {column} = :ids WHERE id = :user_id'),
+                {'ids': json.dumps(item_ids), 'user_id': user_id},
+            )
+
+    for _, table, item_column, _ in reversed(LISTS):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_{item_column}_user_id')
+
+        op.drop_table(table)
@@ -0,0 +1,102 @@
+"""Add normalized tag, course_tag and blog_tag tables
+
+Revision ID: a5f08c3e6b72
+Revises: e7a3b5c1d924
+Create Date: 2026-10-17 14:05:51.227640
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5f08c3e6b72'
+down_revision = 'e7a3b5c1d924'
+branch_labels = None
+depends_on = None
+
+
+def _load_tags(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def upgrade():
+    tag = op.create_table('tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(length=100), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=False),
+    sa.Column('color', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tag_slug'), ['slug'], unique=True)
+
+    course_tag = op.create_table('course_tag',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['course.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id', 'tag_id')
+    )
+    with op.batch_alter_table('course_tag', schema=None) as batch_op:
+        batch_op.create_index('ix_course_tag_tag_id_course_id', ['tag_id', 'course_id'], unique=False)
+
+    blog_tag = op.create_table('blog_tag',
+    sa.Column('blog_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['blog_id'], ['blog.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('blog_id', 'tag_id')
+    )
+    with op.batch_alter_table('blog_tag', schema=None) as batch_op:
+        batch_op.create_index('ix_blog_tag_tag_id_blog_id', ['tag_id', 'blog_id'], unique=False)
+
+    # Backfill from the JSON tags columns
+    bind = op.get_bind()
+    tags = {}
+    links = {'course': [], 'blog': []}
+    for kind, table, id_column in (('course', 'course', 'course_id'), ('blog', 'blog', 'blog_id')):
+        for row_id, raw_tags in bind.execute(sa.text(f'SELECT id, tags FROM {table}')):
+            seen = set()
+            for entry in _load_tags(raw_tags):
+                if not isinstance(entry, dict) or not isinstance(entry.get('label'), str):
+                    continue
+                label = entry['label'].strip()
+                slug = label.lower()
+                if not slug or slug in seen:
+                    continue
+                seen.add(slug)
+                tags.setdefault(slug, {'id': len(tags) + 1, 'slug': slug, 'label': label, 'color': entry.get('color')})
+                links[kind].append({id_column: row_id, 'tag_id': tags[slug]['id']})
+
+    if tags:
+        op.bulk_insert(tag, list(tags.values()))
+    if links['course']:
+        op.bulk_insert(course_tag, links['course'])
+    if links['blog']:
+        op.bulk_insert(blog_tag, links['blog'])
+
+    if tags and bind.dialect.name == 'postgresql':
+        # Explicit ids were inserted; move the sequence past them
+        op.execute("SELECT setval(pg_get_serial_sequence('tag', 'id'), (SELECT MAX(id) FROM tag))")
+
+
+def downgrade():
+    with op.batch_alter_table('blog_tag', schema=None) as batch_op:
+        batch_op.drop_index('ix_blog_tag_tag_id_blog_id')
+
+    op.drop_table('blog_tag')
+    with op.batch_alter_table('course_tag', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_tag_tag_id_course_id')
+
+    op.drop_table('course_tag')
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tag_slug'))
+
+    op.drop_table('tag')
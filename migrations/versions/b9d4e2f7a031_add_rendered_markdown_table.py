@@ -0,0 +1,29 @@
+"""Add rendered_markdown table for the render-once markdown cache
+
+Revision ID: b9d4e2f7a031
+Revises: d2b6a8e4f017
+Create Date: 2026-10-17 15:48:09.217354
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4e2f7a031'
+down_revision = 'd2b6a8e4f017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rendered_markdown',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('html', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+
+def downgrade():
+    op.drop_table('rendered_markdown')
@@ -0,0 +1,30 @@
+"""Add updated_at to blog for HTTP validators
+
+Revision ID: c41d7e9f2a58
+Revises: 8b2e4f6a9c13
+Create Date: 2026-10-17 11:48:10.904271
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9f2a58'
+down_revision = '8b2e4f6a9c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite cannot ADD COLUMN with a non-constant default, so recreate the table
+    with op.batch_alter_table('blog', schema=None, recreate='always') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False))
+
+    # Existing posts were last modified when they were published
+    op.execute('UPDATE blog SET updated_at = publication_date WHERE publication_date IS NOT NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('blog', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,26 @@
+"""Add composite index for blog keyset pagination
+
+Revision ID: d2b6a8e4f017
+Revises: a5f08c3e6b72
+Create Date: 2026-10-17 15:12:26.480913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b6a8e4f017'
+down_revision = 'a5f08c3e6b72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blog', schema=None) as batch_op:
+        batch_op.create_index('ix_blog_publication_date_id', ['publication_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('blog', schema=None) as batch_op:
+        batch_op.drop_index('ix_blog_publication_date_id')
@@ -0,0 +1,49 @@
+"""Add full-text search index for courses and blogs
+
+Revision ID: e7a3b5c1d924
+Revises: c41d7e9f2a58
+Create Date: 2026-10-17 13:20:33.671025
+
+Populate it after upgrading with: flask search reindex
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b5c1d924'
+down_revision = 'c41d7e9f2a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, "
+            "tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        return
+
+    op.create_table('search_index',
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'ref_id')
+    )
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE search_index ADD COLUMN document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX ix_search_index_document ON search_index USING GIN (document)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS search_index")
@@ -0,0 +1,28 @@
+"""Seed the blog_feed cache version
+
+Revision ID: f6a1c8d3e592
+Revises: b9d4e2f7a031
+Create Date: 2026-10-17 16:21:37.804615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a1c8d3e592'
+down_revision = 'b9d4e2f7a031'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = sa.table('cache_versions',
+    sa.column('name', sa.String),
+    sa.column('version', sa.Integer)
+    )
+    op.bulk_insert(cache_versions, [{'name': 'blog_feed', 'version': 0}])
+
+
+def downgrade():
+    op.execute("DELETE FROM cache_versions WHERE name = 'blog_feed'")
@@ -5,6 +5,7 @@ Run this once after adding the role field to the User model.
 from app import create_app
 from app.database import db
 from app.models import User
+from app.user_cache import bump_version
 import os
 
 app = create_app()
@@ -19,6 +20,7 @@ with app.app_context():
     if admin_user:
         # Update role to admin
         admin_user.role = "admin"
+        bump_version(admin_user.id)
         db.session.commit()
         print(f"✓ Updated user '{admin_user.username}' ({admin_email}) to have role='admin'")
     else: